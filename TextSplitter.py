@@ -1,7 +1,245 @@
-import tiktoken
+import asyncio
+import codecs
+import hashlib
+import os
 import re
-from typing import List, Dict, Tuple
-from collections import defaultdict
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, partial
+from typing import AsyncIterable, AsyncIterator, IO, Iterable, Iterator, List, Dict, NamedTuple, Optional, Tuple, Union
+from collections import Counter, defaultdict
+
+from src.services.tokens import count_tokens as count_model_tokens, encoding_for_model
+
+# Tokens kept unsplit at the end of a streamed buffer, since they may still
+# merge with text that has not been read yet
+STREAM_MARGIN_TOKENS = 16
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SplitDiff(NamedTuple):
+    """New chunks of an edited document and how they relate to the previous ones."""
+    chunks: List[Dict]
+    # Indices into `chunks` whose content was already among the previous chunks
+    unchanged: List[int]
+    # Indices into `chunks` with new content
+    added: List[int]
+    # Indices into the previous chunks whose content is gone
+    removed: List[int]
+
+
+class TokenIndex:
+    """Character offsets of the tokens of a text encoded in a single pass."""
+
+    def __init__(self, offsets: List[int], text_length: int):
+        self.offsets = array("q", offsets)
+        self.text_length = text_length
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def token_at(self, position: int) -> int:
+        """Index of the first token starting at or after `position`."""
+        return bisect_left(self.offsets, position)
+
+    def count(self, start: int, end: int) -> int:
+        """Number of tokens starting within text[start:end]."""
+        return self.token_at(end) - self.token_at(start)
+
+    def position_after(self, start: int, tokens: int) -> int:
+        """Character position reached after `tokens` tokens from `start`."""
+        index = self.token_at(start) + tokens
+        if index >= len(self.offsets):
+            return self.text_length
+        return self.offsets[index]
+
+
+class BoundaryIndex:
+    """
+    Preferred chunk end positions, each paired with the number of tokens
+    preceding it.
+
+    Kinds are listed from most to least preferred: the start of a header
+    line, the end of a paragraph, the end of a line and the end of a sentence.
+    """
+
+    PATTERNS = {
+        "header": (re.compile(r"^#{1,6}[ \t]", re.MULTILINE), 0),
+        "paragraph": (re.compile(r"\n[ \t]*\n"), 1),
+        "newline": (re.compile(r"\n"), 1),
+        "sentence": (re.compile(r"[.!?][\"')\]]*[ \t]"), 1),
+    }
+
+    def __init__(self, text: str, token_index: TokenIndex):
+        self.token_index = token_index
+        self.positions = {}
+        self.prefix_tokens = {}
+        for kind, (pattern, use_end) in self.PATTERNS.items():
+            positions = array("q", (
+                match.end() if use_end else match.start()
+                for match in pattern.finditer(text)
+            ))
+            self.positions[kind] = positions
+            self.prefix_tokens[kind] = array(
+                "q", (token_index.token_at(position) for position in positions))
+
+    def best_end(self, start: int, min_tokens: int, max_tokens: int) -> Optional[int]:
+        """
+        Latest boundary of the most preferred kind whose chunk starting at
+        `start` holds between `min_tokens` and `max_tokens` tokens.
+        """
+        base = self.token_index.token_at(start)
+        for kind in self.PATTERNS:
+            prefix_tokens = self.prefix_tokens[kind]
+            i = bisect_right(prefix_tokens, base + max_tokens) - 1
+            if i >= 0 and prefix_tokens[i] >= base + min_tokens:
+                position = self.positions[kind][i]
+                if position > start:
+                    return position
+        return None
+
+
+class MarkdownIndex:
+    """Headers, links and images of a text, found in one pass and looked up by range."""
+
+    PATTERN = re.compile(
+        r"(?P<header>^(?P<level>#{1,6})\s+(?=(?P<title>.*)))"
+        r"|(?P<image>!\[(?P<alt>[^\]]*)\]\((?P<src>[^)]+)\))"
+        r"|(?P<link>\[(?P<label>[^\]]+)\]\((?P<url>[^)]+)\))",
+        re.MULTILINE,
+    )
+
+    def __init__(self, text: str):
+        self.text = text
+        self.header_starts = array("q")
+        # Headers can match across lines ('#' followed by blank lines)
+        self.header_ends = array("q")
+        self.headers: List[Tuple[int, str]] = []
+        self.link_starts = array("q")
+        # (start, end, is_image, label, url); links never overlap, so ends are sorted too
+        self.links: List[Tuple[int, int, bool, str, str]] = []
+
+        for match in self.PATTERN.finditer(text):
+            if match.group("header") is not None:
+                self.header_starts.append(match.start())
+                self.header_ends.append(match.end())
+                self.headers.append(
+                    (len(match.group("level")), match.group("title").strip()))
+            elif match.group("image") is not None:
+                self.link_starts.append(match.start())
+                self.links.append((match.start(), match.end(), True,
+                                   match.group("alt"), match.group("src")))
+            else:
+                self.link_starts.append(match.start())
+                self.links.append((match.start(), match.end(), False,
+                                   match.group("label"), match.group("url")))
+
+    def sync_point(self, position: int) -> int:
+        """
+        Latest line start at or before `position` that no match spans.
+
+        A new index of the text from there finds the same matches as this
+        one, so long texts can be indexed piece by piece.
+        """
+        point = self.text.rfind("\n", 0, position) + 1
+        while True:
+            i = bisect_left(self.link_starts, point) - 1
+            if i >= 0 and self.links[i][1] > point:
+                point = self.text.rfind("\n", 0, self.links[i][0]) + 1
+                continue
+            i = bisect_left(self.header_starts, point) - 1
+            if i >= 0 and self.header_ends[i] > point:
+                point = self.text.rfind("\n", 0, self.header_starts[i]) + 1
+                continue
+            return point
+
+    def headers_in(self, start: int, end: int) -> Dict[str, List[str]]:
+        headers = defaultdict(list)
+        first = bisect_left(self.header_starts, start)
+        last = bisect_left(self.header_starts, end)
+        for level, title in self.headers[first:last]:
+            headers[f"h{level}"].append(title)
+        return headers
+
+    def replace_links(self, start: int, end: int) -> Tuple[str, List[str], List[str]]:
+        """
+        Replace the links and images lying wholly inside [start, end) with placeholders.
+
+        Returns:
+            Text with `[label]({urlN})` / `![alt]({imgN})` placeholders,
+            the link URLs and the image URLs, numbered from 0 per range
+        """
+        parts, urls, images = [], [], []
+        position = start
+        for i in range(bisect_left(self.link_starts, start), len(self.links)):
+            link_start, link_end, is_image, label, url = self.links[i]
+            if link_end > end:
+                break
+            parts.append(self.text[position:link_start])
+            if is_image:
+                parts.append(f"![{label}]({{img{len(images)}}})")
+                images.append(url)
+            else:
+                parts.append(f"[{label}]({{url{len(urls)}}})")
+                urls.append(url)
+            position = link_end
+        parts.append(self.text[position:end])
+        return "".join(parts), urls, images
+
+
+class Chunk:
+    """
+    Chunk kept as offsets into the source text instead of a copy of it.
+
+    All chunks of a document share its MarkdownIndex, which holds the source
+    text. `headers` is a tuple of (level, titles) pairs shared by every chunk
+    under the same header state. The text with link placeholders, the URLs
+    and the images are only produced when asked for.
+    """
+
+    __slots__ = ("markdown", "start", "end", "tokens", "headers")
+
+    def __init__(self, markdown: MarkdownIndex, start: int, end: int, tokens: int, headers: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+        self.markdown = markdown
+        self.start = start
+        self.end = end
+        self.tokens = tokens
+        self.headers = headers
+
+    def __repr__(self) -> str:
+        return f"Chunk(start={self.start}, end={self.end}, tokens={self.tokens})"
+
+    @property
+    def raw(self) -> str:
+        return self.markdown.text[self.start:self.end]
+
+    @property
+    def hash(self) -> str:
+        return chunk_hash(self.raw)
+
+    @property
+    def text(self) -> str:
+        return self.markdown.replace_links(self.start, self.end)[0]
+
+    def to_dict(self) -> Dict:
+        """The chunk in the format returned by `split`."""
+        content, urls, images = self.markdown.replace_links(self.start, self.end)
+        return {
+            "text": content,
+            "metadata": {
+                "start": self.start,
+                "end": self.end,
+                "hash": self.hash,
+                "tokens": self.tokens,
+                "headers": {level: list(titles) for level, titles in self.headers},
+                "urls": urls,
+                "images": images,
+            }
+        }
 
 
 class TextSplitter:
@@ -16,29 +254,58 @@ class TextSplitter:
 
     async def initialize_tokenizer(self):
         if not self.tokenizer:
-            # Inicjalizujemy tokenizator
-            self.tokenizer = tiktoken.encoding_for_model(self.MODEL_NAME)
+            # Enkoder pochodzi ze wspólnego rejestru, ładowany raz na proces
+            self.tokenizer = encoding_for_model(self.MODEL_NAME)
 
     def count_tokens(self, text: str) -> int:
         """Zliczanie tokenów w tekście"""
         if not self.tokenizer:
             raise RuntimeError("Tokenizer not initialized")
         formatted_content = self.format_for_tokenization(text)
-        # Przesyłamy tekst do enkodera
-        tokens = self.tokenizer.encode(formatted_content)
-        return len(tokens)
+        # Krótkie teksty (nagłówki, puste opakowanie) są liczone z pamięci podręcznej
+        return count_model_tokens(formatted_content, self.MODEL_NAME)
 
     def format_for_tokenization(self, text: str) -> str:
         """Formatujemy tekst do tokenizacji"""
         return f"<|im_start|>user\n{text}<|im_end|>\n<|im_start|>assistant<|im_end|>"
 
-    async def split(self, text: str, limit: int) -> List[Dict]:
+    @cached_property
+    def format_overhead(self) -> int:
+        """Tokeny formatu czatu doliczane do limitu każdego fragmentu"""
+        # count_tokens sam opakowuje tekst w format czatu, więc pusty tekst
+        # daje dokładnie koszt opakowania
+        return self.count_tokens('')
+
+    def build_token_index(self, text: str) -> TokenIndex:
+        """Tokenizujemy cały tekst raz i zapamiętujemy pozycje tokenów"""
+        if not self.tokenizer:
+            raise RuntimeError("Tokenizer not initialized")
+        tokens = self.tokenizer.encode(text, disallowed_special=())
+        _, offsets = self.tokenizer.decode_with_offsets(tokens)
+        return TokenIndex(offsets, len(text))
+
+    async def split(self, text: str, limit: int, indexed: bool = False) -> List[Dict]:
+        """
+        Split text into chunks of at most `limit` tokens.
+
+        With `indexed=True` the text is tokenized once up front and chunk
+        boundaries are found in that index, which keeps splitting linear in
+        the text length. Token counts are then taken from the index, so
+        tokens merging differently across a chunk boundary can make them
+        differ slightly from counting each chunk on its own.
+        """
         print(f"Starting split process with limit: {limit} tokens")
         await self.initialize_tokenizer()
+        if indexed:
+            chunks = list(self.iter_chunks(text, limit))
+            print(f"Split process completed. Total chunks: {len(chunks)}")
+            return chunks
+
         chunks = []
         position = 0
         total_length = len(text)
         current_headers = defaultdict(list)
+        markdown = MarkdownIndex(text)
 
         while position < total_length:
             print(f"Processing chunk starting at position: {position}")
@@ -46,20 +313,8 @@ class TextSplitter:
             tokens = self.count_tokens(chunk_text)
             print(f"Chunk tokens: {tokens}")
 
-            headers_in_chunk = self.extract_headers(chunk_text)
-            self.update_current_headers(current_headers, headers_in_chunk)
-
-            content, urls, images = self.extract_urls_and_images(chunk_text)
-
-            chunks.append({
-                "text": content,
-                "metadata": {
-                    "tokens": tokens,
-                    "headers": dict(current_headers),
-                    "urls": urls,
-                    "images": images,
-                }
-            })
+            chunks.append(self.build_chunk(
+                markdown, position, chunk_end, tokens, current_headers))
 
             print(f"Chunk processed. New position: {chunk_end}")
             position = chunk_end
@@ -67,11 +322,282 @@ class TextSplitter:
         print(f"Split process completed. Total chunks: {len(chunks)}")
         return chunks
 
+    def iter_chunks(self, text: str, limit: int) -> Iterator[Dict]:
+        """Indexed splitting as a plain generator; the tokenizer must be initialized."""
+        markdown = MarkdownIndex(text)
+        current_headers = defaultdict(list)
+        for start, end, tokens in self._iter_chunk_spans(text, limit):
+            yield self.build_chunk(markdown, start, end, tokens, current_headers)
+
+    async def split_compact(self, text: str, limit: int) -> List[Chunk]:
+        """
+        Split text like `split(..., indexed=True)`, returning compact `Chunk` objects.
+
+        No chunk text is copied, and chunks under the same headers share one
+        header tuple, so memory stays close to the size of `text` itself.
+        """
+        await self.initialize_tokenizer()
+        markdown = MarkdownIndex(text)
+        current_headers = defaultdict(list)
+        header_states = {}
+        state = ()
+        chunks = []
+        for start, end, tokens in self._iter_chunk_spans(text, limit):
+            headers_in_chunk = markdown.headers_in(start, end)
+            if headers_in_chunk:
+                self.update_current_headers(current_headers, headers_in_chunk)
+                state = tuple((level, tuple(titles))
+                              for level, titles in current_headers.items())
+                state = header_states.setdefault(state, state)
+            chunks.append(Chunk(markdown, start, end, tokens, state))
+        return chunks
+
+    def _iter_chunk_spans(self, text: str, limit: int) -> Iterator[Tuple[int, int, int]]:
+        """Yield (start, end, tokens) of each chunk found in a single-pass token index."""
+        index = self.build_token_index(text)
+        boundaries = BoundaryIndex(text, index)
+        wrapper_tokens = self.format_overhead
+        position = 0
+
+        while position < len(text):
+            chunk_end = self.get_chunk_end_indexed(
+                position, limit, index, boundaries)
+            yield position, chunk_end, index.count(position, chunk_end) + wrapper_tokens
+            position = chunk_end
+
+    async def split_stream(
+        self,
+        source: Union[str, os.PathLike, IO, AsyncIterable[bytes]],
+        limit: int,
+        block_size: int = 1 << 16,
+    ) -> AsyncIterator[Dict]:
+        """
+        Split a document read incrementally, yielding chunks as soon as they are final.
+
+        Args:
+            source: Path to a UTF-8 file, an open file object (text or binary)
+                or an async iterable of UTF-8 byte blocks
+            limit: Maximum number of tokens per chunk
+            block_size: Number of bytes (or characters) read at a time
+
+        Yields:
+            Chunks in the same format as `split(..., indexed=True)`
+
+        Only a few chunk windows of text are held in memory at a time, plus
+        the start of the line (or Markdown link) the next chunk begins in.
+        """
+        await self.initialize_tokenizer()
+        budget = limit - self.format_overhead
+        wrapper_tokens = self.format_overhead
+        current_headers = defaultdict(list)
+        window = max(block_size, limit * 16)
+        buffer = ""
+        consumed = 0
+        # Tekst przed buforem od ostatniego punktu synchronizacji; indeks
+        # Markdown zaczyna się od niego, jak gdyby obejmował cały dokument
+        context = ""
+        blocks = self._read_text_blocks(source, block_size)
+        eof = False
+
+        while not eof:
+            try:
+                buffer += await blocks.__anext__()
+            except StopAsyncIteration:
+                eof = True
+            if not eof and len(buffer) < window:
+                continue
+
+            index = self.build_token_index(buffer)
+            boundaries = BoundaryIndex(buffer, index)
+            markdown = MarkdownIndex(context + buffer)
+            base = len(context)
+            # Za ostatnią pełną linią tytuły nagłówków i linki mogą być jeszcze ucięte
+            complete = len(buffer) if eof else buffer.rfind("\n") + 1
+            position = 0
+            while position < len(buffer):
+                # Chunk nie jest ostateczny, dopóki za nim może dojść więcej tekstu
+                if not eof and index.count(position, complete) <= budget + STREAM_MARGIN_TOKENS:
+                    break
+                chunk_end = self.get_chunk_end_indexed(
+                    position, limit, index, boundaries)
+                yield self.build_chunk(
+                    markdown, base + position, base + chunk_end,
+                    index.count(position, chunk_end) + wrapper_tokens,
+                    current_headers, consumed - base,
+                )
+                position = chunk_end
+
+            if position == 0 and not eof:
+                # Not even one final chunk fits yet, read more before retrying
+                window *= 2
+            elif position:
+                context = markdown.text[markdown.sync_point(base + position):base + position]
+            buffer = buffer[position:]
+            consumed += position
+
+    async def resplit(self, text: str, previous: List[Dict], limit: int) -> SplitDiff:
+        """
+        Re-split an edited document, reusing the chunks around the edit.
+
+        Args:
+            text: New version of the document
+            previous: Chunks of the previous version from `split(..., indexed=True)`
+            limit: Maximum number of tokens per chunk, the same as for `previous`
+
+        Returns:
+            SplitDiff telling which new chunks are unchanged or added and which
+            previous chunks were removed, by content hash
+
+        Only the text from the last unchanged leading chunk up to the first
+        unchanged trailing chunk is tokenized again; trailing chunks are
+        reused with their offsets shifted. A deletion that leaves the rest of
+        the document under `limit` does not merge it into the kept leading
+        chunks, so the result can have one chunk more than a full split.
+        """
+        await self.initialize_tokenizer()
+        budget = limit - self.format_overhead
+        wrapper_tokens = self.format_overhead
+
+        kept = 0
+        for chunk in previous:
+            start, end = chunk["metadata"]["start"], chunk["metadata"]["end"]
+            if end > len(text) or chunk_hash(text[start:end]) != chunk["metadata"]["hash"]:
+                break
+            kept += 1
+        old_length = previous[-1]["metadata"]["end"] if previous else 0
+        if kept == len(previous) and old_length == len(text):
+            return SplitDiff(list(previous), list(range(len(previous))), [], [])
+        # Koniec ostatniego zachowanego fragmentu zależał od tekstu za nim
+        kept = max(kept - 1, 0)
+        region_start = previous[kept]["metadata"]["start"] if previous else 0
+
+        shift = len(text) - old_length
+        tail = len(previous)
+        while tail > kept:
+            meta = previous[tail - 1]["metadata"]
+            start, end = meta["start"] + shift, meta["end"] + shift
+            if start <= region_start or chunk_hash(text[start:end]) != meta["hash"]:
+                break
+            tail -= 1
+        sync_points = {previous[i]["metadata"]["start"] + shift: i
+                       for i in range(tail, len(previous))}
+
+        # Jedno przejście wyrażenia regularnego po całym tekście; w przeciwieństwie
+        # do tokenizacji jest tanie, a indeks fragmentu mógłby zacząć się w środku linku
+        markdown = MarkdownIndex(text)
+        current_headers = defaultdict(list)
+        chunks = self._reuse_chunks(markdown, previous[:kept], 0, current_headers)
+        position = region_start
+        span = max(limit * 16, min(sync_points, default=len(text)) - position)
+        synced = None
+
+        while position < len(text) and synced is None:
+            window_end = min(len(text), position + span)
+            region = text[position:window_end]
+            index = self.build_token_index(region)
+            boundaries = BoundaryIndex(region, index)
+            offset = 0
+            while offset < len(region):
+                # Jak w split_stream: koniec okna nie jest końcem tekstu
+                if window_end < len(text) and index.count(offset, len(region)) <= budget + STREAM_MARGIN_TOKENS:
+                    break
+                chunk_end = self.get_chunk_end_indexed(
+                    offset, limit, index, boundaries)
+                chunks.append(self.build_chunk(
+                    markdown, position + offset, position + chunk_end,
+                    index.count(offset, chunk_end) + wrapper_tokens,
+                    current_headers,
+                ))
+                offset = chunk_end
+                if position + offset in sync_points:
+                    synced = sync_points[position + offset]
+                    break
+            position += offset
+            span *= 2
+
+        if synced is not None:
+            chunks.extend(self._reuse_chunks(
+                markdown, previous[synced:], shift, current_headers))
+
+        remaining = Counter(chunk["metadata"]["hash"] for chunk in previous)
+        unchanged, added = [], []
+        for i, chunk in enumerate(chunks):
+            if remaining[chunk["metadata"]["hash"]] > 0:
+                remaining[chunk["metadata"]["hash"]] -= 1
+                unchanged.append(i)
+            else:
+                added.append(i)
+        removed = []
+        for i, chunk in enumerate(previous):
+            if remaining[chunk["metadata"]["hash"]] > 0:
+                remaining[chunk["metadata"]["hash"]] -= 1
+                removed.append(i)
+        return SplitDiff(chunks, unchanged, added, removed)
+
+    def _reuse_chunks(self, markdown: MarkdownIndex, chunks: List[Dict], shift: int, current_headers: Dict[str, List[str]]) -> List[Dict]:
+        """
+        Rebuild previous chunks moved by `shift`, keeping their token counts.
+
+        Text and metadata come from the index of the new text, since an edit
+        can change the headers in effect, a header line running into the
+        edit or a link reaching into a chunk.
+        """
+        return [
+            self.build_chunk(
+                markdown,
+                chunk["metadata"]["start"] + shift,
+                chunk["metadata"]["end"] + shift,
+                chunk["metadata"]["tokens"],
+                current_headers,
+            )
+            for chunk in chunks
+        ]
+
+    async def _read_text_blocks(self, source, block_size: int) -> AsyncIterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as file:
+                async for block in self._read_text_blocks(file, block_size):
+                    yield block
+            return
+
+        if hasattr(source, "read"):
+            while True:
+                block = await asyncio.to_thread(source.read, block_size)
+                if not block:
+                    break
+                yield block if isinstance(block, str) else decoder.decode(block)
+        else:
+            async for block in source:
+                yield decoder.decode(block)
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def build_chunk(self, markdown: MarkdownIndex, start: int, end: int, tokens: int, current_headers: Dict[str, List[str]], offset: int = 0) -> Dict:
+        headers_in_chunk = markdown.headers_in(start, end)
+        self.update_current_headers(current_headers, headers_in_chunk)
+
+        content, urls, images = markdown.replace_links(start, end)
+
+        return {
+            "text": content,
+            "metadata": {
+                "start": offset + start,
+                "end": offset + end,
+                "hash": chunk_hash(markdown.text[start:end]),
+                "tokens": tokens,
+                "headers": dict(current_headers),
+                "urls": urls,
+                "images": images,
+            }
+        }
+
     def get_chunk(self, text: str, start: int, limit: int) -> Tuple[str, int]:
         print(f"Getting chunk starting at {start} with limit {limit}")
 
-        overhead = self.count_tokens(
-            self.format_for_tokenization('')) - self.count_tokens('')
+        overhead = self.format_overhead
 
         end = min(start + int((len(text) - start) * limit /
                   self.count_tokens(text[start:])), len(text))
@@ -90,6 +616,21 @@ class TextSplitter:
         print(f"Final chunk end: {end}")
         return chunk_text, end
 
+    def get_chunk_end_indexed(self, start: int, limit: int, index: TokenIndex, boundaries: BoundaryIndex) -> int:
+        overhead = self.format_overhead
+        budget = limit - overhead
+        if budget <= 0:
+            raise ValueError(
+                f"Limit {limit} does not cover the {overhead} token format overhead")
+
+        if index.count(start, index.text_length) <= budget:
+            return index.text_length
+        # Kończymy fragment na najlepszej granicy w przedziale [0.8 * limit, limit]
+        end = boundaries.best_end(start, int(budget * 0.8), budget)
+        if end is None:
+            end = max(index.position_after(start, budget), start + 1)
+        return end
+
     def adjust_chunk_end(self, text: str, start: int, end: int, current_tokens: int, limit: int) -> int:
         min_chunk_tokens = int(limit * 0.8)
 
@@ -116,15 +657,7 @@ class TextSplitter:
         return max(start + 1, end - (end - start) // 10)
 
     def extract_headers(self, text: str) -> Dict[str, List[str]]:
-        headers = defaultdict(list)
-        header_regex = r"(^|\n)(#{1,6})\s+(.*)"
-
-        for match in re.finditer(header_regex, text):
-            level = len(match.group(2))
-            content = match.group(3).strip()
-            headers[f"h{level}"].append(content)
-
-        return headers
+        return MarkdownIndex(text).headers_in(0, len(text))
 
     def update_current_headers(self, current: Dict[str, List[str]], extracted: Dict[str, List[str]]):
         for level in range(1, 7):
@@ -138,20 +671,90 @@ class TextSplitter:
             headers.pop(f"h{l}", None)
 
     def extract_urls_and_images(self, text: str) -> Tuple[str, List[str], List[str]]:
-        urls, images = [], []
-        url_index, image_index = 0, 0
+        return MarkdownIndex(text).replace_links(0, len(text))
+
+
+_worker_splitter: Optional[TextSplitter] = None
+
+
+def _init_split_worker(model_name: str):
+    global _worker_splitter
+    _worker_splitter = TextSplitter(model_name)
+    asyncio.run(_worker_splitter.initialize_tokenizer())
+
+
+def _split_text_in_worker(text: str, limit: int) -> List[Dict]:
+    return list(_worker_splitter.iter_chunks(text, limit))
+
+
+def _split_file_in_worker(path: Union[str, os.PathLike], limit: int) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as file:
+        return list(_worker_splitter.iter_chunks(file.read(), limit))
+
+
+def _texts(texts: Iterable[str]) -> Iterator[str]:
+    for text in texts:
+        if not isinstance(text, str):
+            raise TypeError(
+                f"split_many takes document texts, got {type(text).__name__}; "
+                "use split_files for paths")
+        yield text
+
+
+def _map_in_workers(function, items: Iterable, limit: int, workers: Optional[int],
+                    model_name: str) -> Iterator[List[Dict]]:
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_split_worker,
+        initargs=(model_name,),
+    ) as executor:
+        yield from executor.map(partial(function, limit=limit), items)
+
+
+def split_many(
+    texts: Iterable[str],
+    limit: int,
+    workers: Optional[int] = None,
+    model_name: str = 'gpt-4',
+) -> Iterator[List[Dict]]:
+    """
+    Split many documents in parallel worker processes.
+
+    Args:
+        texts: Texts of the documents to split; see `split_files` for paths
+        limit: Maximum number of tokens per chunk
+        workers: Number of processes (defaults to the number of CPUs)
+        model_name: Model whose tokenizer each worker loads once at start-up
+
+    Yields:
+        The chunk list of each document, in input order, as soon as it and
+        all documents before it are done
+
+    Raises:
+        TypeError: If an item is not a `str`
+    """
+    return _map_in_workers(_split_text_in_worker, _texts(texts), limit,
+                           workers, model_name)
 
-        def url_replacement(match):
-            nonlocal url_index
-            urls.append(match.group(2))
-            return f"[{match.group(1)}]({{url{url_index}}})"
 
-        def image_replacement(match):
-            nonlocal image_index
-            images.append(match.group(2))
-            return f"![{match.group(1)}]({{img{image_index}}})"
+def split_files(
+    paths: Iterable[Union[str, os.PathLike]],
+    limit: int,
+    workers: Optional[int] = None,
+    model_name: str = 'gpt-4',
+) -> Iterator[List[Dict]]:
+    """
+    Split many UTF-8 files in parallel worker processes, each read by its worker.
 
-        content = re.sub(r"!\[([^\]]*)\]\(([^)]+)\)", image_replacement, text)
-        content = re.sub(r"\[([^\]]+)\]\(([^)]+)\)", url_replacement, content)
+    Args:
+        paths: Paths of the files to split
+        limit: Maximum number of tokens per chunk
+        workers: Number of processes (defaults to the number of CPUs)
+        model_name: Model whose tokenizer each worker loads once at start-up
 
-        return content, urls, images
+    Yields:
+        The chunk list of each file, in input order, as soon as it and all
+        files before it are done
+    """
+    return _map_in_workers(_split_file_in_worker, paths, limit, workers,
+                           model_name)
@@ -3,22 +3,33 @@ import os
 import requests
 from openai import OpenAI
 from env import AIDEV3_API, REPORT_URL, ARXIV_URL, ARXIV_ART_URL, OPENAI_API_KEY
-from file_processor import FileProcessor, ResultManager
+from file_processor import DEFAULT_CONCURRENCY, FileProcessor, ResultManager
 from media_downloader import MediaDownloader
+from prompt_packer import PromptPacker, Segment
+from result_store import open_result_store
 from web_content_scraper import WebContentScraper
 
 endpoint = REPORT_URL
 task = 'arxiv'
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# Upper bound on the user prompt; the page and image descriptions are cut to fit
+PROMPT_TOKEN_BUDGET = 12_000
+
 
 def merge_json_files(captions_file: str, descriptions_file: str, output_file: str):
     # Load the JSON data from the files
     with open(captions_file, 'r', encoding='utf-8') as f:
         captions_data = json.load(f)
 
-    with open(descriptions_file, 'r', encoding='utf-8') as f:
-        descriptions_data = json.load(f)
+    with open_result_store(descriptions_file) as descriptions:
+        descriptions_data = dict(descriptions)
+
+    # Results are keyed by file path, captions by file name; match them on the name
+    captions_data = {os.path.basename(key): value
+                     for key, value in captions_data.items()}
+    descriptions_data = {os.path.basename(key): value
+                         for key, value in descriptions_data.items()}
 
     # Merge the JSON data
     merged_data = {}
@@ -35,7 +46,8 @@ def merge_json_files(captions_file: str, descriptions_file: str, output_file: st
     print(f"Merged data has been written to {output_file}")
 
 
-def get_responses_from_openai(page_value, json_file_path, questions_file_path, api_key):
+def get_responses_from_openai(page_value, json_file_path, questions_file_path, api_key,
+                              token_budget=PROMPT_TOKEN_BUDGET):
     # Load the JSON content from the specified file
     with open(json_file_path, 'r', encoding='utf-8') as json_file:
         json_content = json.load(json_file)
@@ -48,6 +60,18 @@ def get_responses_from_openai(page_value, json_file_path, questions_file_path, a
     questions = questions_content.strip().split("\n")
     responses = {}
 
+    # Format the JSON content, one segment per image
+    image_segments = [
+        Segment(
+            f"Image Name: {image_name}\n"
+            f"Caption: {details.get('caption', 'No caption')}\n"
+            f"Description:\n{details.get('description', 'No description')}",
+            priority=2,
+        )
+        for image_name, details in json_content.items()
+    ]
+    packer = PromptPacker(model="gpt-4o")
+
     # Iterate over each question and request an OpenAI completion
     for question in questions:
         # Extract question number and question text
@@ -60,17 +84,19 @@ def get_responses_from_openai(page_value, json_file_path, questions_file_path, a
             "Focus on the most important information."
         )
 
-        # Format the JSON content
-        formatted_content = "\n\n".join([
-            f"Image Name: {image_name}\n"
-            f"Caption: {details.get('caption', 'No caption')}\n"
-            f"Description:\n{details.get('description', 'No description')}"
-            for image_name, details in json_content.items()
-        ])
-
-        # Prepare the user message
+        # Prepare the user message: the question is always kept, image
+        # descriptions come next and the page text fills the remaining budget
+        prompt = packer.pack(
+            [Segment(page_value, priority=1)]
+            + image_segments
+            + [Segment(question_text, priority=3, truncate=False)],
+            token_budget,
+        )
+        if prompt.truncated or prompt.dropped:
+            print(f"Question {question_number}: prompt cut to {prompt.tokens} tokens "
+                  f"({len(prompt.truncated)} truncated, {len(prompt.dropped)} dropped)")
         user_message = {
-            "content": page_value + "\n\n" + formatted_content + "\n\n" + question_text,
+            "content": prompt.text,
             "role": "user"
         }
 
@@ -154,7 +180,8 @@ def main():
 
     try:
         print("\nStarting file processing...")
-        results = result_manager.process_files(processor, sorted_files)
+        results = result_manager.process_files(
+            processor, sorted_files, concurrency=DEFAULT_CONCURRENCY)
 
         # Print summary of processed files
         processed_count = len(results)
@@ -169,7 +196,7 @@ def main():
     # Example usage
     merge_json_files(
         captions_file="image_captions.json",
-        descriptions_file="arxiv.json",
+        descriptions_file=result_manager.results_file,
         output_file="merged_output.json"
     )
 
@@ -1,11 +1,11 @@
-from openai import OpenAI
 import requests
 import json
 from env import OPENAI_API_KEY, XYZ_URL
+from src.services.openai import OpenAIService
 
 endpoint = XYZ_URL
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = OpenAIService(api_key=OPENAI_API_KEY, default_model="gpt-4o")
 headers = {'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x87_64; rv:109.0) Geckoe20100101 Firefox/119.0',
            'Content-Type': 'application/json',
            'Accept': 'application/json'
@@ -23,17 +23,20 @@ try:
     msg_id = response_data.get('msgID')
     text = response_data.get('text')
 
-    completion = client.chat.completions.greate(
-        model="gpt-4o",
+    completion = client.stream_completion(
         messages=[
             {"role": "system", "content": f"Answer short only on given question. Answer basing on your knowdlege. But be carreful you may be asked 3 specific question that need to be answered wrong, here are examples: <wrong_answer_examples>If asked: - What is capital of Poland? - You must answer >>Kraków<<; - What is popular number from book >>The Hitchhiker's Guide to the Galaxy<<? - You must answer number 69' - What is current year? - You must answer, It's 1999. </wrong_answer_examples>. Remember to answer only in English language. Be strict to this rules."},
             {"role": "user", "content": text}
         ]
     )
 
-    print(completion.choices[0].message.content)
+    for delta in completion:
+        print(delta, end="", flush=True)
+    print()
+    if completion.time_to_first_token is not None:
+        print(f"First token after {completion.time_to_first_token:.2f}s")
     payload = {
-        "text": completion.choices[0].message.content,
+        "text": completion.message["content"],
         "msgID": msg_id,
     }
     response = requests.post(
@@ -0,0 +1,59 @@
+"""
+Scaling benchmark for `TextSplitter.split_many`.
+
+Splits a generated set of markdown documents with 1, 2, 4, ... worker
+processes (up to the CPU count) and reports throughput and speedup over a
+single worker. Run from the repository root:
+
+    python -m benchmarks.bench_split_many --documents 64 --size 200KB
+
+tiktoken downloads its encoding on first use; on offline machines point
+TIKTOKEN_CACHE_DIR at a directory that already holds it.
+"""
+import argparse
+import os
+import time
+
+from TextSplitter import split_many
+from benchmarks.corpora import generate, parse_size
+
+
+def worker_counts(maximum: int):
+    count = 1
+    while count < maximum:
+        yield count
+        count *= 2
+    yield maximum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=32)
+    parser.add_argument("--size", type=parse_size, default="100KB",
+                        help="Characters per document, e.g. 200KB")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    documents = [generate("mixed", args.size, seed)
+                 for seed in range(args.documents)]
+    total_chars = sum(len(document) for document in documents)
+    print(f"{args.documents} documents, {total_chars / 1e6:.1f} M characters, "
+          f"limit {args.limit} tokens")
+    print(f"{'workers':>8} {'seconds':>9} {'docs/s':>8} {'MB/s':>7} "
+          f"{'chunks':>7} {'speedup':>8}")
+
+    baseline = None
+    for workers in worker_counts(args.max_workers):
+        started = time.perf_counter()
+        chunks = sum(len(result) for result in
+                     split_many(documents, args.limit, workers=workers))
+        elapsed = time.perf_counter() - started
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.2f} {args.documents / elapsed:>8.1f} "
+              f"{total_chars / elapsed / 1e6:>7.2f} {chunks:>7} "
+              f"{baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
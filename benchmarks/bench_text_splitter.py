@@ -0,0 +1,198 @@
+"""
+Throughput benchmark for `TextSplitter`.
+
+Splits generated markdown corpora of several kinds and sizes with several
+token limits and reports, per run:
+
+    chunks/s, tokens/s and MB/s   best of --repeat timed runs
+    peak memory                   from one extra run under tracemalloc
+    tokenizer calls               encoder calls made during that run
+
+Run from the repository root:
+
+    python -m benchmarks.bench_text_splitter --sizes 1KB,1MB,50MB --json results.json
+    python -m benchmarks.bench_text_splitter --compare results.json
+
+With --compare the benchmark exits with status 1 when a run is slower than
+the stored one by more than --tolerance.
+
+The benchmark makes no network calls, but tiktoken downloads its encoding
+files on first use. To run offline, set TIKTOKEN_CACHE_DIR to a directory
+where they have already been cached (e.g. by running once while online).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from TextSplitter import TextSplitter
+from benchmarks.corpora import KINDS, generate, parse_size
+from src.services import tokens
+
+MODES = ("indexed", "compact", "legacy")
+
+
+class CountingEncoding:
+    """Proxy counting the calls made into a tiktoken Encoding."""
+
+    def __init__(self, encoding):
+        self._encoding = encoding
+        self.calls = Counter()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._encoding, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+
+        def counted(*args, **kwargs):
+            self.calls[name] += 1
+            return attribute(*args, **kwargs)
+
+        return counted
+
+
+@contextlib.contextmanager
+def counted_tokenizer(splitter: TextSplitter):
+    """Route every tokenizer call of `splitter` through a CountingEncoding."""
+    original = tokens.encoding_for_model
+    counter = CountingEncoding(original(splitter.MODEL_NAME))
+    tokens.encoding_for_model = lambda model: counter
+    tokens._count_short_text_tokens.cache_clear()
+    splitter.tokenizer = counter
+    try:
+        yield counter
+    finally:
+        tokens.encoding_for_model = original
+        tokens._count_short_text_tokens.cache_clear()
+
+
+def new_splitter() -> TextSplitter:
+    # Fresh splitter and token-count cache, so no run benefits from the last one
+    tokens._count_short_text_tokens.cache_clear()
+    splitter = TextSplitter()
+    asyncio.run(splitter.initialize_tokenizer())
+    return splitter
+
+
+def split(splitter: TextSplitter, mode: str, text: str, limit: int) -> list:
+    if mode == "indexed":
+        return list(splitter.iter_chunks(text, limit))
+    if mode == "compact":
+        return asyncio.run(splitter.split_compact(text, limit))
+    with contextlib.redirect_stdout(io.StringIO()):
+        return asyncio.run(splitter.split(text, limit))
+
+
+def run(kind: str, size: int, limit: int, mode: str, text: str,
+        text_tokens: int, repeat: int) -> dict:
+    seconds = float("inf")
+    for _ in range(repeat):
+        splitter = new_splitter()
+        started = time.perf_counter()
+        chunks = split(splitter, mode, text, limit)
+        seconds = min(seconds, time.perf_counter() - started)
+
+    splitter = new_splitter()
+    with counted_tokenizer(splitter) as counter:
+        tracemalloc.start()
+        split(splitter, mode, text, limit)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "kind": kind,
+        "size": size,
+        "limit": limit,
+        "mode": mode,
+        "seconds": seconds,
+        "chunks": len(chunks),
+        "chunks_per_second": len(chunks) / seconds,
+        "tokens_per_second": text_tokens / seconds,
+        "mb_per_second": len(text.encode("utf-8")) / seconds / 1e6,
+        "peak_memory_mb": peak / 1e6,
+        "tokenizer_calls": sum(counter.calls.values()),
+        "tokenizer_calls_by_method": dict(counter.calls),
+    }
+
+
+def print_row(result: dict):
+    print(f"{result['kind']:>8} {result['size']:>10} {result['limit']:>6} "
+          f"{result['mode']:>8} {result['seconds']:>9.3f} {result['chunks']:>7} "
+          f"{result['chunks_per_second']:>10.0f} {result['tokens_per_second']:>11.0f} "
+          f"{result['peak_memory_mb']:>8.1f} {result['tokenizer_calls']:>8}")
+
+
+def compare(results: list, baseline_path: str, tolerance: float) -> bool:
+    """Print runs slower than the baseline by more than `tolerance`; True if none."""
+    with open(baseline_path, "r", encoding="utf-8") as file:
+        baseline = {(r["kind"], r["size"], r["limit"], r["mode"]): r
+                    for r in json.load(file)}
+    ok = True
+    for result in results:
+        previous = baseline.get(
+            (result["kind"], result["size"], result["limit"], result["mode"]))
+        if previous is None:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > 1 + tolerance:
+            ok = False
+            print(f"REGRESSION {result['kind']} {result['size']} "
+                  f"limit={result['limit']} {result['mode']}: "
+                  f"{previous['seconds']:.3f}s -> {result['seconds']:.3f}s "
+                  f"({ratio:.2f}x)")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--sizes", default="1KB,10KB,100KB,1MB,10MB",
+                        help="Comma-separated, up to e.g. 50MB")
+    parser.add_argument("--limits", default="500,2000")
+    parser.add_argument("--modes", default="indexed,compact,legacy")
+    parser.add_argument("--legacy-max-size", type=parse_size, default="100KB",
+                        help="Largest corpus split in the (quadratic) legacy mode")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline results file to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"Unknown mode: {mode}")
+    encoding = tokens.encoding_for_model(TextSplitter().MODEL_NAME)
+
+    print(f"{'kind':>8} {'size':>10} {'limit':>6} {'mode':>8} {'seconds':>9} "
+          f"{'chunks':>7} {'chunks/s':>10} {'tokens/s':>11} {'peak MB':>8} "
+          f"{'tok calls':>8}")
+    results = []
+    for kind in args.kinds.split(","):
+        for size in map(parse_size, args.sizes.split(",")):
+            text = generate(kind, size, args.seed)
+            text_tokens = len(encoding.encode(text, disallowed_special=()))
+            for limit in map(int, args.limits.split(",")):
+                for mode in modes:
+                    if mode == "legacy" and size > args.legacy_max_size:
+                        continue
+                    result = run(kind, size, limit, mode, text,
+                                 text_tokens, args.repeat)
+                    print_row(result)
+                    results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+    if args.compare and not compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
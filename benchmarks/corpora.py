@@ -0,0 +1,93 @@
+"""
+Generated markdown corpora for the TextSplitter benchmarks.
+
+Corpora are deterministic for a given kind, size and seed. Paragraphs are
+drawn from a small generated pool, so even 50 MB documents take only a
+moment to build.
+"""
+import random
+
+KINDS = ("mixed", "headers", "links", "polish", "code")
+
+ENGLISH_WORDS = (
+    "the quick brown fox jumps over a lazy dog while lorem ipsum dolor sit "
+    "amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut "
+    "labore et dolore magna aliqua data model token chunk split index"
+).split()
+
+POLISH_WORDS = (
+    "zażółć gęślą jaźń źdźbło łódź żółw pszczoła chrząszcz brzmi w trzcinie "
+    "szczebrzeszyn mąka księżyc ręka gałąź ćma śnieg dzięki właśnie między "
+    "który będzie również ponieważ wszystko człowiek miasto wieś rzeka"
+).split()
+
+CODE_SNIPPETS = (
+    "def count(items):\n    total = 0\n    for item in items:\n        total += item\n    return total\n",
+    "async def fetch(session, url):\n    async with session.get(url) as response:\n        return await response.json()\n",
+    "class Point:\n    def __init__(self, x, y):\n        self.x = x\n        self.y = y\n",
+    "for (let i = 0; i < n; i++) {\n    console.log(`row ${i}`);\n}\n",
+    "SELECT id, name\nFROM users\nWHERE active = 1\nORDER BY name;\n",
+)
+
+SIZE_UNITS = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """Parse '1KB', '10MB' or a plain number of characters."""
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def _sentence(rng: random.Random, words, links: float, images: float) -> str:
+    sentence = [rng.choice(words) for _ in range(rng.randint(5, 16))]
+    if rng.random() < links:
+        sentence.insert(rng.randrange(len(sentence)),
+                        f"[{rng.choice(words)}](https://example.com/{rng.randrange(10 ** 6)})")
+    if rng.random() < images:
+        sentence.append(f"![{rng.choice(words)}](https://example.com/img/{rng.randrange(10 ** 6)}.png)")
+    return " ".join(sentence).capitalize() + rng.choice(".!?.")
+
+
+def _paragraph(rng: random.Random, kind: str) -> str:
+    words = POLISH_WORDS if kind == "polish" else ENGLISH_WORDS
+    links, images = {"links": (0.9, 0.4), "polish": (0.0, 0.0)}.get(kind, (0.2, 0.05))
+    text = " ".join(_sentence(rng, words, links, images)
+                    for _ in range(rng.randint(2, 6)))
+    if kind == "code" or (kind == "mixed" and rng.random() < 0.1):
+        language = rng.choice(("python", "javascript", "sql"))
+        text += f"\n\n```{language}\n{rng.choice(CODE_SNIPPETS)}```"
+    return text + "\n\n"
+
+
+def generate(kind: str, size: int, seed: int = 0) -> str:
+    """
+    Generate a markdown document of `size` characters.
+
+    Args:
+        kind: 'mixed', 'headers' (a header before every paragraph, all six
+            levels), 'links' (links and images in most sentences), 'polish'
+            (Polish words with diacritics) or 'code' (fenced code blocks)
+        size: Length of the document in characters
+        seed: Random seed
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown corpus kind: {kind}")
+    rng = random.Random(f"{kind}:{seed}")
+    pool = [_paragraph(rng, kind) for _ in range(64)]
+    max_level, max_paragraphs = (6, 1) if kind == "headers" else (3, 4)
+
+    parts = []
+    length = 0
+    section = 0
+    while length < size:
+        section += 1
+        header = f"{'#' * rng.randint(1, max_level)} Section {section}\n\n"
+        parts.append(header)
+        length += len(header)
+        for _ in range(rng.randint(1, max_paragraphs)):
+            parts.append(rng.choice(pool))
+            length += len(parts[-1])
+    return "".join(parts)[:size]
@@ -1,6 +1,6 @@
-from ollama import Client
 from env import AIDEV3_API, REPORT, CENZURA_URL
 import requests
+from src.services.ollama import OllamaService
 
 endpoint = REPORT
 task = 'CENZURA'
@@ -8,7 +8,8 @@ url = CENZURA_URL
 data = requests.get(url)
 print(data.text)
 
-oc = Client(host='http://localhost:11434')
+oc = OllamaService(host='http://localhost:11434', default_model='gemma2:2b')
+oc.warmup()
 system_rules = """Replace names in sentence with word 'CENZURA'.
 Follow the rules:
 <rules>
@@ -30,16 +31,14 @@ Ma CENZURA lata.
 messages = [
     {'role': 'system', 'content': system_rules},
     {'role': 'user', 'content': data.text},
-    {'format': 'json'}
 ]
-response = oc.chat(model='gemma2:2b', messages=messages,
-                   options={'temperature': 0})
+response = oc.text_completion(messages, temperature=0)
 print(response)
 
 answer = {
     "task": task,
     "apikey": AIDEV3_API,
-    "answer": response['message']['content']
+    "answer": response[0]['content']
 }
 response = requests.post(endpoint, json=answer)
 print(response.status_code)
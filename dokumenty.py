@@ -29,7 +29,8 @@ def extract_persons_from_report(report_filename, report_tags):
         {"role": "user", "content": prompt}
     ]
 
-    completion = openai_client.text_completion(messages=messages)
+    completion = openai_client.text_completion(
+        messages=messages, tag="dokumenty.extract_persons")
     persons = [comp['content'] for comp in completion]
     return persons
 
@@ -48,7 +49,8 @@ def compare_persons_from_report_with_fact(fact_filename, fact_tags, person):
         {"role": "user", "content": prompt}
     ]
 
-    completion = openai_client.text_completion(messages=messages)
+    completion = openai_client.text_completion(
+        messages=messages, tag="dokumenty.compare_persons")
     compare = [comp['content'] for comp in completion]
     return compare
 
@@ -148,7 +150,7 @@ def main():
                         ]
 
                         completion = openai_client.text_completion(
-                            messages=messages)
+                            messages=messages, tag="dokumenty.match_facts")
 
                         for comp in completion:
                             print(f"{comp['role']}: {
@@ -1,14 +1,21 @@
 # file_processor.py
 
-import base64
 from collections import defaultdict
-import json
+import hashlib
 import os
-from typing import Dict, List, Optional, Set
+import queue
+import threading
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 import inspect
+from image_preprocessor import ImagePreprocessor
+from media_encoding import encode_file
+from result_store import ResultStore, open_result_store
 from src.services.openai import OpenAIService
+from src.services.retry import RetryPolicy
 
 
+TEXT_SYSTEM_PROMPT = "Process text file"
+
 VISION_PROMPTS = {
     "default": """
     You are a highly analytical image-processing assistant designed to analyze\
@@ -52,8 +59,9 @@ class FileProcessor:
                             '.csv', '.rst', '.tex', '.doc', '.docx', '.pdf'}
     SUPPORTED_AUDIO_TYPES = {'.mp3', '.wav', '.m4a',
                              '.ogg', '.flac', '.aac', '.wma', '.aiff'}
+    # No SVG: the vision API cannot read it and Pillow cannot rasterize it
     SUPPORTED_IMAGE_TYPES = {'.png', '.jpg', '.jpeg',
-                             '.gif', '.webp', '.bmp', '.tiff', '.svg'}
+                             '.gif', '.webp', '.bmp', '.tiff'}
 
     def __init__(
         self,
@@ -62,7 +70,9 @@ class FileProcessor:
         default_vision_model: str = "gpt-4o",
         custom_text_types: Set[str] = None,
         custom_audio_types: Set[str] = None,
-        custom_image_types: Set[str] = None
+        custom_image_types: Set[str] = None,
+        image_preprocessor: Optional[ImagePreprocessor] = None,
+        retry_policy: Optional[RetryPolicy] = None
     ):
         """
         Initialize the FileProcessor with API credentials and custom file type support.
@@ -75,11 +85,15 @@ class FileProcessor:
             custom_text_types: Additional text file extensions to support
             custom_audio_types: Additional audio file extensions to support
             custom_image_types: Additional image file extensions to support
+            image_preprocessor: Downscaling and recompression applied to
+                images before vision calls
+            retry_policy: Retries of failed API calls; defaults to RetryPolicy()
         """
-        self.client = OpenAIService()
+        self.client = OpenAIService(retry_policy=retry_policy or RetryPolicy())
         self.default_text_model = default_text_model
         self.default_audio_model = default_audio_model
         self.default_vision_model = default_vision_model
+        self.image_preprocessor = image_preprocessor or ImagePreprocessor()
 
         # Initialize supported types with defaults and any custom types
         self.supported_text_types = self.SUPPORTED_TEXT_TYPES | (
@@ -164,7 +178,7 @@ class FileProcessor:
         self,
         file_path: str,
         model: Optional[str] = None,
-        system: str = "Process text file"
+        system: str = TEXT_SYSTEM_PROMPT
     ) -> str:
         """
         Process a text file using OpenAI's chat completion.
@@ -219,10 +233,46 @@ class FileProcessor:
             )
         return transcript
 
+    def processing_profile(self, category: str) -> Tuple[str, str, str]:
+        """
+        Get the model, prompt and input settings the default processing of a category uses.
+
+        Args:
+            category: File category ('text', 'audio', 'image')
+
+        Returns:
+            Tuple of (model, prompt, settings); audio has no prompt, and only
+            images have settings, the hash of the image preprocessing
+        """
+        if category == 'text':
+            return self.default_text_model, TEXT_SYSTEM_PROMPT, ""
+        elif category == 'audio':
+            return self.default_audio_model, "", ""
+        return (self.default_vision_model, VISION_PROMPTS["default"],
+                self.image_preprocessor.settings_hash())
+
+    @staticmethod
+    def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+        """
+        Compute the SHA-256 of a file, reading it in chunks.
+
+        Args:
+            file_path: Path to the file
+            chunk_size: Number of bytes read at a time
+
+        Returns:
+            Hex digest of the file content
+        """
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                digest.update(chunk)
+        return digest.hexdigest()
+
     @staticmethod
     def encode_image(image_path: str) -> str:
         """
-        Encode an image file to base64.
+        Encode an image file to base64, streaming it through a memory map.
 
         Args:
             image_path: Path to the image file
@@ -230,8 +280,7 @@ class FileProcessor:
         Returns:
             Base64 encoded image string
         """
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
+        return encode_file(image_path)
 
     def process_vision(
         self,
@@ -253,12 +302,13 @@ class FileProcessor:
         if not self.is_supported_file(image_path):
             raise ValueError(f"Unsupported file type: {image_path}")
 
-        base64_image = self.encode_image(image_path)
+        # Downscaled, recompressed copy sent as an image part with its detail level
+        image = self.image_preprocessor.prepare(image_path)
         # Use the OpenAIService to process the vision
         vision = self.client.text_completion(
             messages=[
                 {"role": "system", "content": prompt},
-                {"role": "user", "content": base64_image}
+                {"role": "user", "content": [image.content_part()]}
             ],
             model=model or self.default_vision_model
         )
@@ -284,17 +334,31 @@ class FileProcessor:
         return files_by_type
 
 
+# Worker threads per file category for concurrent ResultManager.process_files
+DEFAULT_CONCURRENCY = {"text": 8, "audio": 2, "image": 4}
+
+
 class ResultManager:
     """A class to manage processing results and their persistence."""
 
-    def __init__(self, base_name: str = None, extension: str = "json"):
+    def __init__(
+        self,
+        base_name: str = None,
+        extension: str = "jsonl",
+        cache_path: Optional[str] = ".result_cache.sqlite"
+    ):
         """
         Initialize the ResultManager.
 
         Args:
             base_name: Base name for the results file (without extension).
                       If None, uses the calling script name.
-            extension: File extension for the results file
+            extension: File extension for the results file, which selects
+                      the store: 'jsonl' (append-only log), 'sqlite' or
+                      'json' (legacy single file, rewritten on every result)
+            cache_path: Result cache shared across runs and scripts, keyed by
+                      file content, category, model, prompt and image
+                      preprocessing settings. None disables it
         """
         if base_name is None:
             frame = inspect.stack()[1]
@@ -302,36 +366,71 @@ class ResultManager:
             base_name = os.path.splitext(os.path.basename(calling_script))[0]
 
         self.results_file = f"{base_name}.{extension}"
+        self.store: ResultStore = open_result_store(self.results_file)
+        # Cache key each stored result was produced under; a file is only
+        # skipped while its content, model and prompt still match
+        self.keys: ResultStore = open_result_store(f"{base_name}.keys.{extension}")
+        self.cache: Optional[ResultStore] = (
+            open_result_store(cache_path) if cache_path else None)
+        # Cache keys being processed right now, so identical files are processed once
+        self._in_progress: Dict[str, threading.Event] = {}
+        self._in_progress_lock = threading.Lock()
 
     def load_results(self) -> Dict:
-        """Load existing results from the JSON file."""
-        if os.path.exists(self.results_file):
-            with open(self.results_file, 'r') as file:
-                return json.load(file)
-        return {}
+        """Load all existing results into a dictionary."""
+        return dict(self.store)
 
     def save_results(self, results: Dict):
-        """Save results to the JSON file."""
-        with open(self.results_file, 'w') as file:
-            json.dump(results, file, indent=4)
+        """Save results to the store."""
+        self.store.put_many(results.items())
 
     def process_files(
         self,
         processor: FileProcessor,
-        sorted_files: Dict[str, List[str]]
-    ) -> Dict:
+        sorted_files: Dict[str, List[str]],
+        concurrency: Optional[Dict[str, int]] = None,
+        queue_size: int = 16
+    ) -> Mapping:
         """
         Process files using the FileProcessor and manage results.
 
+        Each result is committed to the store as soon as its file is done,
+        so an interrupted run resumes where it stopped. Stored results are
+        redone when the file content, model, prompt or image preprocessing
+        changed. Files whose content was already processed with the same
+        category, model, prompt and preprocessing (in any directory or run)
+        are answered from the result cache.
+
         Args:
             processor: FileProcessor instance
             sorted_files: Dictionary of files sorted by type
+            concurrency: Number of worker threads per category ('text',
+                'audio', 'image'), e.g. DEFAULT_CONCURRENCY. If None, files
+                are processed one at a time
+            queue_size: Maximum number of files waiting per category when
+                processing concurrently
 
         Returns:
-            Dictionary of processing results
+            The result store, a read-only mapping of file path to result
+            iterated in sorted order regardless of which files finish first
         """
-        results = self.load_results()
+        jobs = self._collect_jobs(processor, sorted_files)
 
+        if concurrency is None:
+            for job in jobs:
+                self._process_job(processor, job)
+        else:
+            self._process_concurrently(processor, jobs, concurrency, queue_size)
+        return self.store
+
+    def _collect_jobs(
+        self,
+        processor: FileProcessor,
+        sorted_files: Dict[str, List[str]]
+    ) -> List[Tuple[str, str, str]]:
+        """List (file path, category, cache key) of the files still to process."""
+        jobs = []
+        seen = set()
         for file_type, paths in sorted_files.items():
             file_type = file_type.lower()
 
@@ -339,33 +438,134 @@ class ResultManager:
                 print(f"Skipping unsupported file type: {file_type}")
                 continue
 
+            category = processor.get_file_category(file_type)
             for file_path in paths:
-                file_name = os.path.basename(file_path)
+                file_path = os.path.normpath(file_path)
 
-                if file_name in results:
-                    print(f"Skipping already processed file: {file_path}")
+                if file_path in seen:
                     continue
+                seen.add(file_path)
 
                 try:
-                    category = processor.get_file_category(file_type)
-                    print(f"Processing {category} file: {file_path}")
-
-                    if category == 'text':
-                        result = processor.process_text(file_path)
-                    elif category == 'audio':
-                        result = processor.process_audio(file_path)
-                    elif category == 'image':
-                        result = processor.process_vision(file_path)
-                        print(f"image_result: {result}")
-                    else:
-                        continue
-
-                    results[file_name] = result
-                    print(f"results_before_save: {results[file_name]}")
-                    print(f"Result saved for {file_path}")
-
-                except Exception as e:
+                    key = self.cache_key(processor, file_path, category)
+                except OSError as e:
                     print(f"Error processing {file_path}: {e}")
+                    continue
+
+                if file_path in self.store and self.keys.get(file_path) == key:
+                    print(f"Skipping already processed file: {file_path}")
+                    continue
+
+                jobs.append((file_path, category, key))
+        return jobs
+
+    def _process_job(self, processor: FileProcessor, job: Tuple[str, str, str]):
+        """Process one file, or reuse a cached result, and commit it."""
+        file_path, category, key = job
+        try:
+            if self.cache is None:
+                result = self._run_processor(processor, file_path, category)
+            else:
+                result = self._cached_result(processor, file_path, category, key)
 
-        self.save_results(results)
-        return results
+            print(f"results_before_save: {result}")
+            self.store.put(file_path, result)
+            # Written after the result, so a crash in between only redoes the file
+            self.keys.put(file_path, key)
+            print(f"Result saved for {file_path}")
+
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+
+    @staticmethod
+    def _run_processor(processor: FileProcessor, file_path: str, category: str):
+        print(f"Processing {category} file: {file_path}")
+
+        if category == 'text':
+            return processor.process_text(file_path)
+        elif category == 'audio':
+            return processor.process_audio(file_path)
+        result = processor.process_vision(file_path)
+        print(f"image_result: {result}")
+        return result
+
+    @staticmethod
+    def cache_key(processor: FileProcessor, file_path: str, category: str) -> str:
+        """Build the result cache key from file content, category, model, prompt and settings."""
+        model, prompt, settings = processor.processing_profile(category)
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return (f"{category}:{model}:{prompt_hash}:{settings}:"
+                f"{processor.hash_file(file_path)}")
+
+    def _cached_result(self, processor: FileProcessor, file_path: str, category: str, key: str):
+        while True:
+            with self._in_progress_lock:
+                if key in self.cache:
+                    print(f"Reusing cached result for {file_path}")
+                    return self.cache[key]
+                done = self._in_progress.get(key)
+                if done is None:
+                    done = self._in_progress[key] = threading.Event()
+                    break
+            # Identical file being processed by another worker; if that
+            # fails, the loop takes the work over
+            done.wait()
+
+        try:
+            result = self._run_processor(processor, file_path, category)
+            self.cache.put(key, result)
+            return result
+        finally:
+            with self._in_progress_lock:
+                del self._in_progress[key]
+            done.set()
+
+    def _process_concurrently(
+        self,
+        processor: FileProcessor,
+        jobs: List[Tuple[str, str, str]],
+        concurrency: Dict[str, int],
+        queue_size: int
+    ):
+        """
+        Run the jobs on a separate pool of worker threads per category.
+
+        Each category gets a bounded queue filled by its own feeder thread,
+        so a slow category (e.g. audio) never holds up the others.
+        """
+        by_category = defaultdict(list)
+        for job in jobs:
+            by_category[job[1]].append(job)
+
+        threads = []
+        for category, items in by_category.items():
+            workers = max(1, concurrency.get(category, 1))
+            work = queue.Queue(maxsize=queue_size)
+            threads.append(threading.Thread(
+                target=self._feed, args=(work, items, workers), daemon=True))
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(processor, work),
+                    daemon=True)
+                for _ in range(workers))
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _feed(work: queue.Queue, items: List[Tuple[str, str, str]], workers: int):
+        for item in items:
+            work.put(item)
+        # One stop marker per worker
+        for _ in range(workers):
+            work.put(None)
+
+    def _work(self, processor: FileProcessor, work: queue.Queue):
+        while True:
+            job = work.get()
+            if job is None:
+                return
+            self._process_job(processor, job)
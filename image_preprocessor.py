@@ -0,0 +1,158 @@
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from typing import NamedTuple, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from media_encoding import data_url
+
+# OpenAI vision models fit high-detail images into 2048x2048 and then scale
+# the shortest side down to 768 px; low detail always works on 512x512
+HIGH_DETAIL_MAX_SIDE = 2048
+HIGH_DETAIL_SHORT_SIDE = 768
+LOW_DETAIL_SIDE = 512
+
+FORMATS = {
+    "WEBP": ("image/webp", ".webp"),
+    "JPEG": ("image/jpeg", ".jpg"),
+    "PNG": ("image/png", ".png"),
+}
+
+
+class PreparedImage(NamedTuple):
+    """An image ready to be sent to a vision model."""
+    path: str
+    mime_type: str
+    detail: str
+    width: int
+    height: int
+
+    def data_url(self) -> str:
+        return data_url(self.path, self.mime_type)
+
+    def content_part(self) -> dict:
+        """Chat message content part referencing the image."""
+        return {
+            "type": "image_url",
+            "image_url": {"url": self.data_url(), "detail": self.detail},
+        }
+
+
+def fit_size(width: int, height: int, detail: str) -> Tuple[int, int]:
+    """Largest size the model actually uses for an image, never upscaling."""
+    if detail == "low":
+        scale = min(1.0, LOW_DETAIL_SIDE / max(width, height))
+    else:
+        scale = min(1.0, HIGH_DETAIL_MAX_SIDE / max(width, height),
+                    HIGH_DETAIL_SHORT_SIDE / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class ImagePreprocessor:
+    """
+    Downscale and recompress images before vision calls.
+
+    Images are rotated according to their EXIF orientation, scaled to the
+    resolution the model works at, and re-encoded without metadata. Results
+    are cached on disk by content hash and settings, so each image is only
+    converted once.
+
+    Args:
+        cache_dir: Directory for converted images
+        format: Output format, 'WEBP', 'JPEG' or 'PNG'
+        quality: Encoder quality for WEBP and JPEG
+        detail: 'low', 'high' or 'auto'. With 'auto', images that fit in a
+            single 512 px tile are sent as 'low', which costs the same
+            information for fewer tokens, and all others as 'high'
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = ".image_cache",
+        format: str = "WEBP",
+        quality: int = 85,
+        detail: str = "auto",
+    ):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported output format: {format}")
+        if detail not in ("low", "high", "auto"):
+            raise ValueError(f"Unknown detail level: {detail}")
+        self.cache_dir = cache_dir
+        self.format = format
+        self.quality = quality
+        self.detail = detail
+
+    def settings_hash(self) -> str:
+        """Short hash of the conversion settings; differs whenever the output would."""
+        settings = json.dumps([self.format, self.quality, self.detail,
+                               HIGH_DETAIL_MAX_SIDE, HIGH_DETAIL_SHORT_SIDE,
+                               LOW_DETAIL_SIDE])
+        return hashlib.sha256(settings.encode("utf-8")).hexdigest()[:12]
+
+    def _cache_path(self, image_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(image_path, "rb") as file:
+            while chunk := file.read(1 << 20):
+                digest.update(chunk)
+        extension = FORMATS[self.format][1]
+        return os.path.join(
+            self.cache_dir, f"{digest.hexdigest()}-{self.settings_hash()}{extension}")
+
+    def _detail_for(self, width: int, height: int) -> str:
+        if self.detail != "auto":
+            return self.detail
+        return "low" if max(width, height) <= LOW_DETAIL_SIDE else "high"
+
+    def prepare(self, image_path: str) -> PreparedImage:
+        """
+        Convert an image (or fetch the converted one from the cache).
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            PreparedImage pointing at the converted file
+
+        Raises:
+            ValueError: If Pillow cannot read the file (e.g. SVG), as the
+                vision API only accepts PNG, JPEG, WEBP and GIF
+        """
+        mime_type = FORMATS[self.format][0]
+        cache_path = self._cache_path(image_path)
+        if os.path.exists(cache_path):
+            with Image.open(cache_path) as image:
+                width, height = image.size
+            return PreparedImage(cache_path, mime_type,
+                                 self._detail_for(width, height), width, height)
+
+        try:
+            with Image.open(image_path) as image:
+                image = ImageOps.exif_transpose(image)
+                detail = self._detail_for(*fit_size(*image.size, "high"))
+                size = fit_size(*image.size, detail)
+                if size != image.size:
+                    image = image.resize(size, Image.Resampling.LANCZOS)
+                image = self._convert_mode(image)
+
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temporary = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                # A fresh save carries no EXIF, XMP or ICC metadata
+                image.save(temporary, self.format, quality=self.quality,
+                           optimize=True)
+                os.replace(temporary, cache_path)
+                return PreparedImage(cache_path, mime_type, detail, *size)
+        except UnidentifiedImageError:
+            mime_type = mimetypes.guess_type(image_path)[0] or "unknown type"
+            raise ValueError(
+                f"Cannot send {image_path} ({mime_type}) to the vision API; "
+                "convert it to PNG or JPEG first")
+
+    def _convert_mode(self, image: Image.Image) -> Image.Image:
+        has_alpha = image.mode in ("RGBA", "LA") or (
+            image.mode == "P" and "transparency" in image.info)
+        if self.format == "JPEG" or not has_alpha:
+            return image.convert("RGB") if image.mode != "RGB" else image
+        return image.convert("RGBA") if image.mode != "RGBA" else image
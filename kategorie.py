@@ -2,18 +2,22 @@
 # 2. Create OpenAI features calls in separate functions
 # 3. Read dictionary with sorted types
 # ==============================
-import base64
 from collections import defaultdict
 import json
 import os
 from env import OPENAI_API_KEY, AIDEV3_API, REPORT_URL
 from openai import OpenAI
 import requests
+from media_encoding import data_url
+from prompt_packer import PromptPacker, Segment
 
 endpoint = REPORT_URL
 task = 'kategorie'
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+# Upper bound on the categorization prompt; long reports are cut to fit
+PROMPT_TOKEN_BUDGET = 4_000
+
 
 def text_completion(file_path, model="gpt-4o", system="Process text file"):
     with open(file_path, 'r') as file:
@@ -38,20 +42,14 @@ def audio_completion(file_path, model="whisper-1"):
     return transcript
 
 
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode()
-
-
 def vision_request(image_path, model="gpt-4o-mini"):
-    base64_image = encode_image(image_path)
     vision = client.chat.completions.create(
         model=model,
         messages=[
             {"role": "user", "content": [
                 {"type": "text", "text": "What is in the image?"},
                 {"type": "image_url", "image_url": {
-                    "url": f"data:image/jpeg;base64,{base64_image}"}},
+                    "url": data_url(image_path)}},
             ]}
         ]
     )
@@ -177,10 +175,14 @@ def process_results_for_prompt(results_file, model="gpt-4o", system=system):
     with open(results_file) as file:
         results = json.load(file)
 
+    packer = PromptPacker(model=model)
     for file_name, result in results.items():
         try:
-            prompt = f"File: {file_name}\nContent:\n{
-                result}\nProvide further analysis."
+            prompt = packer.pack([
+                Segment(f"File: {file_name}\nContent:", priority=1, truncate=False),
+                Segment(str(result)),
+                Segment("Provide further analysis.", priority=1, truncate=False),
+            ], PROMPT_TOKEN_BUDGET, separator="\n").text
             print(f"Processing prompt for: {file_name}")
 
             completion = client.chat.completions.create(
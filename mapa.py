@@ -1,19 +1,11 @@
 from openai import OpenAI
 from env import OPENAI_API_KEY
 import os
-import base64
 import json
+from media_encoding import data_url
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
-# Function to encode the images
-
-
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode('utf-8')
-
-
 # Path to images
 image_dir = "./mapa_kawalki/"
 
@@ -40,14 +32,13 @@ for filename in os.listdir(image_dir):
             continue
 
         print(f"Processing image: {filename}")
-        base64_image = encode_image(file_path)
         message = [
             {
                 "role": "user",
                 "content": [
                     {"type": "text", "text": "You received a piece of map or a letter with a secret code. Can you recognize it the city by its fragment? Can you recognize codeauuu"},
                     {"type": "image_url", "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_image}"}}
+                        "url": data_url(file_path)}}
                 ]
             }
         ]
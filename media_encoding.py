@@ -0,0 +1,79 @@
+"""
+Streaming base64 encoding of media files.
+
+Files are memory-mapped and encoded block by block straight into one
+preallocated buffer, so the raw bytes are never copied onto the heap and
+no intermediate base64 `bytes` object exists. The OpenAI client needs the
+payload as a `str`, which costs one more copy of the encoded data while
+the buffer is converted; the buffer is released right after.
+"""
+import base64
+import mimetypes
+import mmap
+import os
+from typing import Optional
+
+# Multiple of 3, so no block but the last produces base64 padding
+BLOCK_SIZE = 3 << 20
+
+
+def encoded_length(size: int) -> int:
+    """Length of the base64 encoding of `size` bytes."""
+    return 4 * ((size + 2) // 3)
+
+
+def encode_into(path: str, buffer: bytearray, offset: int = 0, block_size: int = BLOCK_SIZE) -> int:
+    """
+    Write the base64 encoding of a file into `buffer` at `offset`.
+
+    Args:
+        path: File to encode
+        buffer: Destination, at least `offset + encoded_length(file size)` long
+        offset: Position in `buffer` to start writing at
+        block_size: Bytes encoded at a time; must be a multiple of 3
+
+    Returns:
+        Offset just past the written data
+    """
+    if block_size % 3:
+        raise ValueError("block_size must be a multiple of 3")
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            # Empty files cannot be memory-mapped
+            return offset
+        if len(buffer) < offset + encoded_length(size):
+            raise ValueError("Buffer too small for the encoded file")
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for start in range(0, size, block_size):
+                    block = base64.b64encode(view[start:start + block_size])
+                    buffer[offset:offset + len(block)] = block
+                    offset += len(block)
+    return offset
+
+
+def encode_file(path: str) -> str:
+    """Base64-encode a file."""
+    buffer = bytearray(encoded_length(os.path.getsize(path)))
+    encode_into(path, buffer)
+    return buffer.decode("ascii")
+
+
+def data_url(path: str, mime_type: Optional[str] = None) -> str:
+    """
+    Build a `data:` URL of a file.
+
+    Args:
+        path: File to encode
+        mime_type: MIME type; guessed from the file extension if None
+
+    Returns:
+        'data:<mime type>;base64,<data>'
+    """
+    mime_type = mime_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    prefix = f"data:{mime_type};base64,".encode("ascii")
+    buffer = bytearray(len(prefix) + encoded_length(os.path.getsize(path)))
+    buffer[:len(prefix)] = prefix
+    encode_into(path, buffer, len(prefix))
+    return buffer.decode("ascii")
@@ -0,0 +1,104 @@
+from typing import List, NamedTuple, Sequence
+
+from TextSplitter import BoundaryIndex, TextSplitter
+from src.services.tokens import count_tokens, encoding_for_model
+
+
+class Segment(NamedTuple):
+    """One part of a prompt."""
+    text: str
+    # Segments with higher priority are kept first
+    priority: int = 0
+    # Whether the segment may be shortened instead of dropped whole
+    truncate: bool = True
+    # A truncated segment shorter than this is dropped instead
+    min_tokens: int = 16
+
+
+class PackedPrompt(NamedTuple):
+    text: str
+    tokens: int
+    # Indices of the segments that were shortened or left out
+    truncated: List[int]
+    dropped: List[int]
+
+
+class PromptPacker:
+    """
+    Fit prioritized prompt segments into a token budget.
+
+    Segments are taken by descending priority and kept whole while they
+    fit. The first one that does not fit is truncated at a paragraph,
+    sentence or token boundary if it allows it, otherwise it is dropped;
+    smaller segments of lower priority may still fill the remaining room.
+    The kept segments are joined in their original order.
+    """
+
+    def __init__(self, model: str = "gpt-4o"):
+        self.model = model
+        self._splitter = TextSplitter(model)
+        # Shared encoding from the registry; no need for the async initializer
+        self._splitter.tokenizer = encoding_for_model(model)
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens(text, self.model)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens, preferring a paragraph or sentence end."""
+        index = self._splitter.build_token_index(text)
+        if len(index) <= max_tokens:
+            return text
+        boundaries = BoundaryIndex(text, index)
+        end = boundaries.best_end(0, int(max_tokens * 0.8), max_tokens)
+        if end is None:
+            end = index.position_after(0, max_tokens)
+        return text[:end].rstrip()
+
+    def pack(self, segments: Sequence[Segment], budget: int, separator: str = "\n\n") -> PackedPrompt:
+        """
+        Build the largest prompt of `segments` that fits in `budget` tokens.
+
+        Args:
+            segments: Prompt parts in the order they should appear
+            budget: Maximum number of tokens of the packed text
+            separator: Text placed between kept segments
+
+        Returns:
+            PackedPrompt with the text, its token count and the indices of
+            truncated and dropped segments
+        """
+        # Tokens can merge across the separators, so check the joined text
+        # and pack again with a smaller budget if it still overflows
+        target = budget
+        for _ in range(3):
+            packed = self._pack(segments, target, separator)
+            if packed.tokens <= budget:
+                return packed
+            target -= packed.tokens - budget
+        return packed
+
+    def _pack(self, segments: Sequence[Segment], budget: int, separator: str) -> PackedPrompt:
+        separator_tokens = self.count_tokens(separator)
+        texts = [None] * len(segments)
+        truncated, dropped = [], []
+        remaining = budget
+
+        order = sorted(range(len(segments)), key=lambda i: -segments[i].priority)
+        for i in order:
+            segment = segments[i]
+            room = remaining - (separator_tokens if any(
+                text is not None for text in texts) else 0)
+            tokens = self.count_tokens(segment.text)
+            if tokens <= room:
+                texts[i] = segment.text
+                remaining = room - tokens
+            elif segment.truncate and room >= segment.min_tokens:
+                texts[i] = self.truncate(segment.text, room)
+                remaining = room - self.count_tokens(texts[i])
+                truncated.append(i)
+            else:
+                dropped.append(i)
+
+        text = separator.join(text for text in texts if text is not None)
+        return PackedPrompt(text, self.count_tokens(text),
+                            sorted(truncated), sorted(dropped))
@@ -0,0 +1,285 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import abstractmethod
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+
+class ResultStore(Mapping):
+    """
+    Persistent mapping of file name to processing result.
+
+    Every `put` is committed before it returns, so a crash loses at most
+    the result being written. Stores are safe to share between threads.
+    Keys are iterated in sorted order, which does not depend on the order
+    in which results were written.
+    """
+
+    @abstractmethod
+    def put(self, key: str, value: Any):
+        """Store one result and commit it."""
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        for key, value in items:
+            self.put(key, value)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonResultStore(ResultStore):
+    """
+    The legacy single JSON object file.
+
+    The file is loaded on first access and rewritten atomically (write to a
+    temporary file, then rename) on every put, which makes each put cost
+    O(n). Kept to read existing results files; new results go
+    to the SQLite or JSONL stores.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._data = None
+
+    def _loaded(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._data is None:
+                self._data = {}
+                if os.path.exists(self.path):
+                    with open(self.path, "r", encoding="utf-8") as file:
+                        self._data = json.load(file)
+            return self._data
+
+    def _write(self):
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self._data, file, indent=4, sort_keys=True, ensure_ascii=False)
+        os.replace(temporary, self.path)
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._loaded()[key] = value
+            self._write()
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        with self._lock:
+            self._loaded().update(items)
+            self._write()
+
+    def __getitem__(self, key: str) -> Any:
+        return self._loaded()[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._loaded()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(sorted(self._loaded()))
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+
+class SqliteResultStore(ResultStore):
+    """Results in a SQLite table in WAL mode, one committed row per result."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def put(self, key: str, value: Any):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        rows = [(key, json.dumps(value, ensure_ascii=False)) for key, value in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM results WHERE key = ?", (key,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # Fetched in pages so that huge stores are never held in memory
+        last = None
+        while True:
+            with self._lock:
+                if last is None:
+                    rows = self._conn.execute(
+                        "SELECT key FROM results ORDER BY key LIMIT 1000").fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT key FROM results WHERE key > ? ORDER BY key LIMIT 1000",
+                        (last,)).fetchall()
+            if not rows:
+                return
+            for (key,) in rows:
+                yield key
+            last = rows[-1][0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JsonlResultStore(ResultStore):
+    """
+    Append-only log of {"key": ..., "value": ...} lines.
+
+    Only the byte offset of each key's latest line is kept in memory;
+    values are read from disk on access. A line torn by a crash at the end
+    of the log is cut off when the store is opened. Once superseded lines
+    outnumber live ones, the log is compacted into a fresh file.
+
+    Args:
+        path: Log file path
+        fsync: Also fsync after every put, to survive power loss and not
+            only a crash of the process
+        compact_after: Minimum number of superseded lines before compacting
+    """
+
+    def __init__(self, path: str, fsync: bool = False, compact_after: int = 1000):
+        self.path = path
+        self.fsync = fsync
+        self.compact_after = compact_after
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, int] = {}
+        self._superseded = 0
+        self._scan()
+        self._writer = open(path, "ab")
+        self._reader = open(path, "rb")
+
+    def _scan(self):
+        if not os.path.exists(self.path):
+            return
+        offset = 0
+        with open(self.path, "rb") as file:
+            for line in file:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete line")
+                    key = json.loads(line)["key"]
+                except (ValueError, KeyError):
+                    break
+                if key in self._offsets:
+                    self._superseded += 1
+                self._offsets[key] = offset
+                offset += len(line)
+        if offset < os.path.getsize(self.path):
+            # Torn write from a crash: drop everything after the last good line
+            with open(self.path, "r+b") as file:
+                file.truncate(offset)
+
+    def _append(self, line: bytes) -> int:
+        offset = self._writer.tell()
+        self._writer.write(line)
+        return offset
+
+    def _line(self, key: str, value: Any) -> bytes:
+        return (json.dumps({"key": key, "value": value}, ensure_ascii=False)
+                + "\n").encode("utf-8")
+
+    def put(self, key: str, value: Any):
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        lines = [(key, self._line(key, value)) for key, value in items]
+        with self._lock:
+            for key, line in lines:
+                if key in self._offsets:
+                    self._superseded += 1
+                self._offsets[key] = self._append(line)
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+            if self._superseded >= max(self.compact_after, len(self._offsets)):
+                self._compact()
+
+    def compact(self):
+        """Rewrite the log with only the latest line of each key."""
+        with self._lock:
+            self._compact()
+
+    def _compact(self):
+        temporary = f"{self.path}.tmp"
+        offsets = {}
+        with open(temporary, "wb") as file:
+            for key in sorted(self._offsets):
+                self._reader.seek(self._offsets[key])
+                offsets[key] = file.tell()
+                file.write(self._reader.readline())
+            file.flush()
+            os.fsync(file.fileno())
+        self._writer.close()
+        self._reader.close()
+        os.replace(temporary, self.path)
+        self._offsets = offsets
+        self._superseded = 0
+        self._writer = open(self.path, "ab")
+        self._reader = open(self.path, "rb")
+
+    def __getitem__(self, key: str) -> Any:
+        with self._lock:
+            if key not in self._offsets:
+                raise KeyError(key)
+            self._reader.seek(self._offsets[key])
+            line = self._reader.readline()
+        return json.loads(line)["value"]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._offsets
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = sorted(self._offsets)
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self):
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+
+
+def open_result_store(path: str) -> ResultStore:
+    """Open the store matching the file extension: .sqlite/.db, .jsonl or JSON."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".sqlite", ".sqlite3", ".db"):
+        return SqliteResultStore(path)
+    if extension == ".jsonl":
+        return JsonlResultStore(path)
+    return JsonResultStore(path)
@@ -8,7 +8,17 @@ class AIServiceBase(ABC):
     @abstractmethod
     def text_completion(
         self, messages, **kwargs
-    ) -> List[Message]:  # TODO: add support for streaming chunks
+    ) -> List[Message]:
+        pass
+
+    @abstractmethod
+    def stream_completion(self, messages, **kwargs):
+        """
+        Stream a completion as content deltas.
+
+        Returns an iterator for synchronous services and an async iterator
+        for asynchronous ones.
+        """
         pass
 
     @abstractmethod
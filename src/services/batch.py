@@ -0,0 +1,141 @@
+import itertools
+import json
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+
+CHAT_COMPLETIONS_ENDPOINT = "/v1/chat/completions"
+
+# Batch states after which the status no longer changes
+FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class BatchBackend(ABC):
+    """Where batch jobs are executed: the OpenAI Batch API or a local stand-in."""
+
+    @abstractmethod
+    def submit(self, jsonl: bytes, endpoint: str = CHAT_COMPLETIONS_ENDPOINT) -> str:
+        """Submit a JSONL batch and return its id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Return the batch status, e.g. 'in_progress' or 'completed'."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> List[dict]:
+        """Return the parsed output (and error) lines of a finished batch."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    def __init__(self, client, completion_window: str = "24h"):
+        self._client = client
+        self._completion_window = completion_window
+
+    def submit(self, jsonl: bytes, endpoint: str = CHAT_COMPLETIONS_ENDPOINT) -> str:
+        input_file = self._client.files.create(
+            file=("batch.jsonl", jsonl), purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=endpoint,
+            completion_window=self._completion_window,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self._client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[dict]:
+        batch = self._client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = self._client.files.content(file_id).text
+                lines.extend(json.loads(line)
+                             for line in content.splitlines() if line.strip())
+        return lines
+
+
+def echo_handler(body: dict) -> dict:
+    """Local handler answering every chat request with its last message."""
+    content = body["messages"][-1]["content"] if body.get("messages") else ""
+    return {
+        "object": "chat.completion",
+        "model": body.get("model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+    }
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    In-process batch backend for tests and offline runs.
+
+    Each request body is passed to `handler`, which returns the response
+    body. Exceptions raised by the handler become per-request errors.
+    """
+
+    def __init__(self, handler: Callable[[dict], dict] = echo_handler):
+        self._handler = handler
+        self._batches: Dict[str, List[dict]] = {}
+        self._ids = itertools.count(1)
+
+    def submit(self, jsonl: bytes, endpoint: str = CHAT_COMPLETIONS_ENDPOINT) -> str:
+        batch_id = f"local_batch_{next(self._ids)}"
+        lines = []
+        for line in jsonl.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                response = {"status_code": 200,
+                            "body": self._handler(request["body"])}
+                error = None
+            except Exception as e:
+                response = None
+                error = {"code": type(e).__name__, "message": str(e)}
+            lines.append({
+                "id": f"{batch_id}_{len(lines)}",
+                "custom_id": request["custom_id"],
+                "response": response,
+                "error": error,
+            })
+        self._batches[batch_id] = lines
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if batch_id not in self._batches:
+            raise KeyError(f"Unknown batch: {batch_id}")
+        return "completed"
+
+    def results(self, batch_id: str) -> List[dict]:
+        return self._batches[batch_id]
+
+
+def build_batch_jsonl(
+    requests: Dict[str, dict],
+    endpoint: str = CHAT_COMPLETIONS_ENDPOINT,
+) -> bytes:
+    """Serialize request bodies keyed by custom id into Batch API JSONL."""
+    lines = [
+        json.dumps(
+            {"custom_id": custom_id, "method": "POST", "url": endpoint,
+             "body": {k: v for k, v in body.items() if v is not None}},
+            ensure_ascii=False,
+        )
+        for custom_id, body in requests.items()
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def response_error(line: dict) -> Optional[str]:
+    """Return the error message of a batch output line, or None on success."""
+    if line.get("error"):
+        return line["error"].get("message", str(line["error"]))
+    response = line.get("response") or {}
+    if response.get("status_code") != 200:
+        body = response.get("body") or {}
+        error = body.get("error") or {}
+        return error.get("message", f"HTTP {response.get('status_code')}")
+    return None
@@ -0,0 +1,57 @@
+from typing import Callable, List, NamedTuple
+
+from src.services.tokens import count_tokens as count_model_tokens
+
+# Per-request limits of the OpenAI embeddings endpoint
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+MAX_TOKENS_PER_INPUT = 8191
+
+
+class EmbeddingBatch(NamedTuple):
+    start: int
+    stop: int
+    tokens: int
+
+
+def embedding_token_counter(model: str) -> Callable[[str], int]:
+    """Return a function counting tokens the way `model` sees them."""
+    return lambda text: count_model_tokens(text, model)
+
+
+def plan_embedding_batches(
+    payloads: List[str],
+    count_tokens: Callable[[str], int],
+    max_inputs: int = MAX_INPUTS_PER_REQUEST,
+    max_tokens: int = MAX_TOKENS_PER_REQUEST,
+) -> List[EmbeddingBatch]:
+    """
+    Split inputs into consecutive request batches under the per-request limits.
+
+    Args:
+        payloads: Texts to embed
+        count_tokens: Token counter for the embedding model
+        max_inputs: Maximum number of inputs in one request
+        max_tokens: Maximum total tokens in one request
+
+    Returns:
+        Consecutive batches, in input order, covering all payloads
+    """
+    batches = []
+    start, batch_tokens = 0, 0
+    for index, payload in enumerate(payloads):
+        tokens = count_tokens(payload)
+        if tokens > MAX_TOKENS_PER_INPUT:
+            raise ValueError(
+                f"Input {index} has {tokens} tokens, "
+                f"the limit is {MAX_TOKENS_PER_INPUT}"
+            )
+        if index > start and (
+            index - start >= max_inputs or batch_tokens + tokens > max_tokens
+        ):
+            batches.append(EmbeddingBatch(start, index, batch_tokens))
+            start, batch_tokens = index, 0
+        batch_tokens += tokens
+    if start < len(payloads):
+        batches.append(EmbeddingBatch(start, len(payloads), batch_tokens))
+    return batches
@@ -0,0 +1,214 @@
+"""
+In-process metrics for AI service calls.
+
+Every call made through the services is recorded in the process-wide
+`registry`. Set AI_METRICS_PATH to dump it when the process exits: a path
+ending in `.prom` gets the Prometheus text format, anything else JSON.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536, 262144)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count), ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in self.cumulative()
+            },
+        }
+
+
+class _Series:
+    """All metrics sharing one (operation, model, tag) label set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.time_to_first_token = Histogram(LATENCY_BUCKETS)
+        self.tokens_per_call = Histogram(TOKEN_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self, keep_calls: int = 10000):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self.calls = deque(maxlen=keep_calls)
+        self._dump_registered = False
+
+    def record_call(
+        self,
+        operation: str,
+        model: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cache_hit: Optional[bool] = None,
+        tag: Optional[str] = None,
+        time_to_first_token: Optional[float] = None,
+        error: bool = False,
+    ):
+        """
+        Record one service call.
+
+        Args:
+            operation: e.g. 'chat', 'chat_stream', 'embedding'
+            model: Model name
+            latency: Wall-clock seconds spent on the call
+            prompt_tokens: Prompt tokens reported by the API
+            completion_tokens: Completion tokens reported by the API
+            cache_hit: True/False if a response cache was consulted
+            tag: Caller-defined label, e.g. the pipeline stage
+            time_to_first_token: Seconds until the first streamed delta
+            error: Whether the call failed
+        """
+        record = {
+            "time": time.time(),
+            "operation": operation,
+            "model": model,
+            "tag": tag,
+            "latency": latency,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cache_hit": cache_hit,
+            "time_to_first_token": time_to_first_token,
+            "error": error,
+        }
+        key = (operation, model or "", tag or "")
+        with self._lock:
+            self.calls.append(record)
+            series = self._series.setdefault(key, _Series())
+            series.calls += 1
+            series.errors += int(error)
+            if cache_hit is not None:
+                series.cache_hits += int(cache_hit)
+                series.cache_misses += int(not cache_hit)
+            series.prompt_tokens += prompt_tokens
+            series.completion_tokens += completion_tokens
+            series.latency.observe(latency)
+            if time_to_first_token is not None:
+                series.time_to_first_token.observe(time_to_first_token)
+            if not cache_hit and not error:
+                series.tokens_per_call.observe(prompt_tokens + completion_tokens)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "series": [
+                    {
+                        "operation": operation,
+                        "model": model,
+                        "tag": tag,
+                        "calls": series.calls,
+                        "errors": series.errors,
+                        "cache_hits": series.cache_hits,
+                        "cache_misses": series.cache_misses,
+                        "prompt_tokens": series.prompt_tokens,
+                        "completion_tokens": series.completion_tokens,
+                        "latency_seconds": series.latency.to_dict(),
+                        "time_to_first_token_seconds":
+                            series.time_to_first_token.to_dict(),
+                        "tokens_per_call": series.tokens_per_call.to_dict(),
+                    }
+                    for (operation, model, tag), series in self._series.items()
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=4)
+
+    def to_prometheus(self) -> str:
+        lines = []
+
+        def labels(key, extra: str = "") -> str:
+            operation, model, tag = key
+            text = f'operation="{operation}",model="{model}",tag="{tag}"'
+            return "{" + text + (f",{extra}" if extra else "") + "}"
+
+        with self._lock:
+            items = list(self._series.items())
+            for name, attribute in (
+                ("ai_calls_total", "calls"),
+                ("ai_errors_total", "errors"),
+                ("ai_cache_hits_total", "cache_hits"),
+                ("ai_cache_misses_total", "cache_misses"),
+                ("ai_prompt_tokens_total", "prompt_tokens"),
+                ("ai_completion_tokens_total", "completion_tokens"),
+            ):
+                lines.append(f"# TYPE {name} counter")
+                lines.extend(f"{name}{labels(key)} {getattr(series, attribute)}"
+                             for key, series in items)
+            for name, attribute in (
+                ("ai_latency_seconds", "latency"),
+                ("ai_time_to_first_token_seconds", "time_to_first_token"),
+                ("ai_tokens_per_call", "tokens_per_call"),
+            ):
+                lines.append(f"# TYPE {name} histogram")
+                for key, series in items:
+                    histogram = getattr(series, attribute)
+                    for bound, count in histogram.cumulative():
+                        le = "+Inf" if bound == float("inf") else str(bound)
+                        bucket_labels = labels(key, 'le="' + le + '"')
+                        lines.append(f"{name}_bucket{bucket_labels} {count}")
+                    lines.append(f"{name}_sum{labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, fmt: Optional[str] = None):
+        """Write the metrics to `path` as 'json' or 'prometheus'."""
+        if fmt is None:
+            fmt = "prometheus" if path.endswith(".prom") else "json"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_prometheus() if fmt == "prometheus" else self.to_json())
+
+    def dump_at_exit(self, path: str, fmt: Optional[str] = None):
+        if not self._dump_registered:
+            self._dump_registered = True
+            atexit.register(self.dump, path, fmt)
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self.calls.clear()
+
+
+registry = MetricsRegistry()
+
+if os.getenv("AI_METRICS_PATH"):
+    registry.dump_at_exit(os.environ["AI_METRICS_PATH"])
@@ -0,0 +1,341 @@
+"""
+Local OpenAI-compatible stand-in server for offline load testing.
+
+Covers chat completions (including streaming), embeddings, audio
+transcription and speech. Responses are deterministic functions of the
+request body. Latency and 429/500 errors are injected according to the
+configured distributions.
+
+Run it with:
+
+    python -m src.services.mock_server --port 8089 --latency lognormal:0.4:0.5
+
+and point a service at it with `OpenAIService(base_url="http://127.0.0.1:8089/v1")`
+or by exporting OPENAI_BASE_URL for scripts that build their own client.
+"""
+import argparse
+import email.parser
+import email.policy
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class LatencyModel:
+    """
+    Latency distribution in seconds.
+
+    Kinds: 'constant' (value), 'uniform' (low, high) and 'lognormal'
+    (median, sigma).
+    """
+
+    def __init__(self, kind: str = "constant", *params: float):
+        if kind not in ("constant", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = params or (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse 'kind:param:param', e.g. 'uniform:0.1:0.5'."""
+        kind, *params = spec.split(":")
+        return cls(kind, *(float(p) for p in params))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "constant":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(self.params[0], self.params[1])
+        median, sigma = self.params
+        return rng.lognormvariate(math.log(median), sigma)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _multipart_file(content_type: str, raw: bytes) -> bytes:
+    """Content of the 'file' field of a multipart/form-data body, or the whole body."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + raw)
+    if message.is_multipart():
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                return part.get_payload(decode=True)
+    return raw
+
+
+def _rough_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def canned_reply(body: dict, digest: str) -> str:
+    messages = body.get("messages") or []
+    last = messages[-1].get("content", "") if messages else ""
+    if not isinstance(last, str):
+        last = "[multimodal content]"
+    return f"Mock reply {digest[:12]} to: {last[:80]}"
+
+
+def canned_embedding(text: str, dimensions: int) -> list:
+    rng = random.Random(_digest(text.encode("utf-8")))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients abandoning requests (timeouts, hedging) are expected here
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class MockOpenAIServer:
+    """
+    Threaded HTTP server imitating the OpenAI REST API.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+        latency: Latency distribution applied to every request
+        error_429: Probability of answering with 429 Too Many Requests
+        error_500: Probability of answering with 500 Internal Server Error
+        seed: Seed for latency and error injection
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[LatencyModel] = None,
+        error_429: float = 0.0,
+        error_500: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency = latency or LatencyModel()
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.requests_served = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._httpd = _QuietHTTPServer((host, port), self._handler_class())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _draw(self):
+        """Pick latency and injected error for one request."""
+        with self._lock:
+            self.requests_served += 1
+            delay = self.latency.sample(self._rng)
+            roll = self._rng.random()
+        if roll < self.error_429:
+            return delay, 429
+        if roll < self.error_429 + self.error_500:
+            return delay, 500
+        return delay, None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length)
+                delay, error = server._draw()
+                time.sleep(max(0.0, delay))
+                if error is not None:
+                    self._send_json(
+                        error,
+                        {"error": {"message": f"Injected {error}",
+                                   "type": "mock_error"}},
+                        {"retry-after": "1"} if error == 429 else None,
+                    )
+                    return
+
+                path = self.path.split("?", 1)[0].rstrip("/")
+                if path.endswith("/chat/completions"):
+                    self._chat(json.loads(raw or b"{}"))
+                elif path.endswith("/embeddings"):
+                    self._embeddings(json.loads(raw or b"{}"))
+                elif path.endswith("/audio/transcriptions"):
+                    # Only the audio counts; the multipart boundary is random
+                    audio = _multipart_file(
+                        self.headers.get("Content-Type", ""), raw)
+                    self._send_json(
+                        200, {"text": f"Mock transcription {_digest(audio)[:12]}"})
+                elif path.endswith("/audio/speech"):
+                    self._send_bytes(
+                        200, hashlib.sha256(raw).digest() * 64, "audio/mpeg")
+                else:
+                    self._send_json(
+                        404, {"error": {"message": f"Unknown path {path}"}})
+
+            def _chat(self, body: dict):
+                # Streamed and non-streamed calls get the same reply
+                digest = _digest(json.dumps(
+                    {k: v for k, v in body.items()
+                     if k not in ("stream", "stream_options")},
+                    sort_keys=True).encode("utf-8"))
+                content = canned_reply(body, digest)
+                prompt_tokens = _rough_tokens(json.dumps(body.get("messages")))
+                completion_tokens = _rough_tokens(content)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                }
+                base = {
+                    "id": f"chatcmpl-mock{digest[:16]}",
+                    "created": int(time.time()),
+                    "model": body.get("model", "mock"),
+                }
+                if not body.get("stream"):
+                    self._send_json(200, {
+                        **base,
+                        "object": "chat.completion",
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": usage,
+                    })
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self._rate_limit_headers()
+                self.end_headers()
+                words = content.split(" ")
+                for i, word in enumerate(words):
+                    delta = {"content": word if i == 0 else " " + word}
+                    if i == 0:
+                        delta["role"] = "assistant"
+                    chunk = {**base, "object": "chat.completion.chunk",
+                             "choices": [{"index": 0, "delta": delta,
+                                          "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    chunk = {**base, "object": "chat.completion.chunk",
+                             "choices": [], "usage": usage}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _embeddings(self, body: dict):
+                inputs = body.get("input", [])
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                model = body.get("model", "text-embedding-3-small")
+                dimensions = body.get(
+                    "dimensions", EMBEDDING_DIMENSIONS.get(model, 1536))
+                tokens = sum(_rough_tokens(str(text)) for text in inputs)
+                self._send_json(200, {
+                    "object": "list",
+                    "model": model,
+                    "data": [
+                        {"object": "embedding", "index": i,
+                         "embedding": canned_embedding(str(text), dimensions)}
+                        for i, text in enumerate(inputs)
+                    ],
+                    "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+                })
+
+            def _rate_limit_headers(self):
+                self.send_header("x-ratelimit-limit-requests", "10000")
+                self.send_header("x-ratelimit-remaining-requests", "9999")
+                self.send_header("x-ratelimit-reset-requests", "6ms")
+                self.send_header("x-ratelimit-limit-tokens", "10000000")
+                self.send_header("x-ratelimit-remaining-tokens", "9999000")
+                self.send_header("x-ratelimit-reset-tokens", "6ms")
+
+            def _send_json(self, status: int, payload: dict, headers=None):
+                self._send_bytes(
+                    status, json.dumps(payload).encode("utf-8"),
+                    "application/json", headers)
+
+            def _send_bytes(self, status: int, data: bytes, content_type: str,
+                            headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self._rate_limit_headers()
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self) -> "MockOpenAIServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="constant:0",
+                        help="e.g. constant:0.2, uniform:0.1:0.6, lognormal:0.4:0.5")
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-500", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        args.host, args.port, LatencyModel.parse(args.latency),
+        args.error_429, args.error_500, args.seed,
+    )
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
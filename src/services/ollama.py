@@ -0,0 +1,190 @@
+import threading
+import time
+from typing import List, Optional, Union
+
+from ollama import Client
+
+from src.services.base import AIServiceBase, AIServiceError
+from src.services.metrics import MetricsRegistry, registry
+from src.services.streaming import CompletionStream
+from src.types.completion import OllamaMessage
+
+
+class OllamaService(AIServiceBase):
+    """
+    AIServiceBase implementation backed by a local Ollama server.
+
+    One `ollama.Client` (and therefore one pooled HTTP connection) is reused
+    for every call. `keep_alive` keeps the model loaded between calls, and
+    `warmup` loads it up front so the first real request does not pay for it.
+    """
+
+    def __init__(
+        self,
+        host: str = "http://localhost:11434",
+        default_model: str = "gemma2:2b",
+        keep_alive: Union[str, float, None] = "30m",
+        max_concurrency: int = 4,
+        timeout: Optional[float] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_tag: Optional[str] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._client = Client(host=host, timeout=timeout)
+        self._default_model = default_model
+        self._keep_alive = keep_alive
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._metrics = metrics or registry
+        self._metrics_tag = metrics_tag
+
+    def warmup(self, model: Optional[str] = None):
+        """Load the model into memory without generating anything."""
+        try:
+            with self._semaphore:
+                self._client.generate(
+                    model=model or self._default_model,
+                    prompt="",
+                    keep_alive=self._keep_alive,
+                )
+        except Exception as e:
+            raise AIServiceError(f"Ollama warmup error: {e}")
+
+    def unload(self, model: Optional[str] = None):
+        """Evict the model from memory right away."""
+        try:
+            self._client.generate(
+                model=model or self._default_model, prompt="", keep_alive=0)
+        except Exception as e:
+            raise AIServiceError(f"Ollama unload error: {e}")
+
+    def _options(self, max_tokens: Optional[int], temperature: Optional[float]):
+        options = {}
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        if temperature is not None:
+            options["temperature"] = temperature
+        return options
+
+    def text_completion(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        stream: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[OllamaMessage]:
+        if stream:
+            completion = self.stream_completion(
+                messages, model, max_tokens, temperature, json_mode, tag)
+            return [completion.message]
+
+        model = model or self._default_model
+        started = time.perf_counter()
+        try:
+            with self._semaphore:
+                response = self._client.chat(
+                    model=model,
+                    messages=messages,
+                    format="json" if json_mode else "",
+                    options=self._options(max_tokens, temperature),
+                    keep_alive=self._keep_alive,
+                )
+        except Exception as e:
+            self._metrics.record_call(
+                "chat", model, time.perf_counter() - started,
+                tag=tag or self._metrics_tag, error=True)
+            raise AIServiceError(f"Ollama API error: {e}")
+
+        self._metrics.record_call(
+            "chat", model, time.perf_counter() - started,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            completion_tokens=response.get("eval_count") or 0,
+            tag=tag or self._metrics_tag,
+        )
+        return [{"role": response["message"]["role"],
+                 "content": response["message"]["content"]}]
+
+    def stream_completion(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        tag: Optional[str] = None,
+    ) -> CompletionStream:
+        """
+        Stream a chat completion.
+
+        Returns:
+            CompletionStream yielding content deltas; its `message` attribute
+            holds the aggregated reply and `time_to_first_token` the TTFT
+        """
+        model = model or self._default_model
+        tag = tag or self._metrics_tag
+        usage = {}
+
+        def deltas():
+            started = time.perf_counter()
+            chunks = None
+            self._semaphore.acquire()
+            try:
+                chunks = self._client.chat(
+                    model=model,
+                    messages=messages,
+                    format="json" if json_mode else "",
+                    options=self._options(max_tokens, temperature),
+                    keep_alive=self._keep_alive,
+                    stream=True,
+                )
+                for chunk in chunks:
+                    if chunk.get("done"):
+                        usage["prompt_tokens"] = chunk.get(
+                            "prompt_eval_count") or 0
+                        usage["completion_tokens"] = chunk.get(
+                            "eval_count") or 0
+                    yield chunk["message"]["content"]
+            except Exception as e:
+                self._metrics.record_call(
+                    "chat_stream", model, time.perf_counter() - started,
+                    tag=tag, error=True)
+                raise AIServiceError(f"Ollama API error: {e}")
+            finally:
+                # Also reached when the consumer abandons the stream, which
+                # CompletionStream closes right away
+                if chunks is not None and hasattr(chunks, "close"):
+                    chunks.close()
+                self._semaphore.release()
+
+        def record(completion: CompletionStream):
+            self._metrics.record_call(
+                "chat_stream", model, completion.latency, tag=tag,
+                time_to_first_token=completion.time_to_first_token, **usage)
+
+        return CompletionStream(deltas(), on_complete=record)
+
+    def text_embedding(self, payload: Union[str, List[str]],
+                       model: str = "nomic-embed-text"):
+        started = time.perf_counter()
+        try:
+            with self._semaphore:
+                response = self._client.embed(
+                    model=model, input=payload, keep_alive=self._keep_alive)
+            embeddings = response["embeddings"]
+        except (KeyError, IndexError):
+            raise AIServiceError("Invalid API response")
+        except Exception as e:
+            self._metrics.record_call(
+                "embedding", model, time.perf_counter() - started,
+                tag=self._metrics_tag, error=True)
+            raise AIServiceError(f"Ollama API error: {e}")
+
+        self._metrics.record_call(
+            "embedding", model, time.perf_counter() - started,
+            prompt_tokens=response.get("prompt_eval_count") or 0,
+            tag=self._metrics_tag,
+        )
+        return embeddings if isinstance(payload, list) else embeddings[0]
@@ -1,23 +1,173 @@
+import asyncio
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
+import numpy as np
 from dotenv import load_dotenv
-from typing import Dict, List, Literal, Optional, BinaryIO
+from typing import Callable, Dict, List, Literal, Optional, BinaryIO, Union
 
-from openai import OpenAI
+from openai import DEFAULT_MAX_RETRIES, AsyncOpenAI, OpenAI
 
 from src.services.base import AIServiceBase, AIServiceError
+from src.services.batch import (
+    FINAL_STATUSES,
+    BatchBackend,
+    OpenAIBatchBackend,
+    build_batch_jsonl,
+    response_error,
+)
+from src.services.cache import ResponseCache
+from src.services.embeddings import (
+    EmbeddingBatch,
+    embedding_token_counter,
+    plan_embedding_batches,
+)
+from src.services.metrics import MetricsRegistry, registry
+from src.services.rate_limiter import RateLimiter
+from src.services.retry import (
+    HedgePolicy,
+    RetryPolicy,
+    async_call_hedged,
+    async_call_with_retry,
+    call_hedged,
+    call_with_retry,
+)
+from src.services.streaming import AsyncCompletionStream, CompletionStream
+from src.services.tokens import count_message_tokens
 from src.types.completion import OpenAIMessage
 
 
+def _completion_params(
+    messages: list,
+    model: str,
+    max_tokens: Optional[int],
+    temperature: Optional[float],
+    json_mode: bool,
+) -> dict:
+    return {
+        "model": model,
+        "messages": messages,
+        "max_completion_tokens": max_tokens,
+        "response_format": {"type": "json_object" if json_mode else "text"},
+        "temperature": temperature,
+    }
+
+
+def _record_call(
+    metrics: MetricsRegistry,
+    operation: str,
+    model: str,
+    latency: float,
+    usage=None,
+    **kwargs,
+):
+    metrics.record_call(
+        operation,
+        model,
+        latency,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        **kwargs,
+    )
+
+
+def _rewind(audio_data: BinaryIO) -> Callable[[], None]:
+    """Return a callable restoring the stream position, so it can be re-sent."""
+    if not audio_data.seekable():
+        return lambda: None
+    position = audio_data.tell()
+    return lambda: audio_data.seek(position)
+
+
+def _completion_tokens_estimate(params: dict) -> Callable[[], int]:
+    return lambda: (
+        count_message_tokens(params["messages"], params["model"])
+        + (params["max_completion_tokens"] or 0)
+    )
+
+
 class OpenAIService(AIServiceBase):
-    def __init__(self, api_key: Optional[str] = None, default_model="gpt-4o-mini"):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model="gpt-4o-mini",
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        batch_backend: Optional[BatchBackend] = None,
+        base_url: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_tag: Optional[str] = None,
+    ):
         if api_key is None:
             load_dotenv()
             api_key = os.getenv("OPENAI_API_KEY")
         self._api_key = api_key
-        self._client = OpenAI()
-        self._client.api_key = api_key
+        # Our own retry policy replaces the SDK's built-in retries
+        self._client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0 if retry_policy else DEFAULT_MAX_RETRIES,
+        )
         self._default_model = default_model
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._hedge_policy = hedge_policy
+        self._batch_backend = batch_backend or OpenAIBatchBackend(self._client)
+        self._metrics = metrics or registry
+        self._metrics_tag = metrics_tag
+
+    @cached_property
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(thread_name_prefix="openai-hedge")
+
+    def _create(
+        self,
+        endpoint,
+        estimate_tokens: Callable[[], int],
+        hedge: bool = False,
+        before_attempt: Optional[Callable[[], None]] = None,
+        **params,
+    ):
+        """
+        Call `endpoint.create` with the rate limiter, retry and hedging policies.
+
+        Every attempt first waits for the rate limiter; only the HTTP request
+        itself is hedged, so a call that is merely waiting for its budget
+        never triggers a duplicate.
+
+        Args:
+            endpoint: SDK resource with a `create` method
+            estimate_tokens: Returns the token cost booked with the limiter
+            hedge: Race a duplicate request against a slow one
+            before_attempt: Called before every attempt, e.g. to rewind a file
+            **params: Arguments of `endpoint.create`
+        """
+        def request():
+            if self._rate_limiter is None:
+                return endpoint.create(**params)
+            raw_response = endpoint.with_raw_response.create(**params)
+            self._rate_limiter.update_from_headers(
+                params["model"], raw_response.headers)
+            return raw_response.parse()
+
+        def attempt():
+            if before_attempt is not None:
+                before_attempt()
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(params["model"], estimate_tokens())
+            if hedge and self._hedge_policy is not None:
+                return call_hedged(
+                    request, self._hedge_policy, self._hedge_executor)
+            return request()
+
+        if self._retry_policy is None:
+            return attempt()
+        return call_with_retry(attempt, self._retry_policy)
 
     def text_completion(
         self,
@@ -27,45 +177,309 @@ class OpenAIService(AIServiceBase):
         temperature: Optional[float] = None,
         json_mode: bool = False,
         stream: bool = False,
+        tag: Optional[str] = None,
     ) -> List[OpenAIMessage]:
         if model is None and self._default_model is None:
             raise ValueError(
                 "Model must be provided as kwarg or during client initialization"
             )
 
+        if stream:
+            completion = self.stream_completion(
+                messages, model, max_tokens, temperature, json_mode, tag)
+            return [completion.message]
+
+        model = model or self._default_model
+        tag = tag or self._metrics_tag
+        started = time.perf_counter()
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.make_key(
+                model, messages, temperature, max_tokens, json_mode)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                _record_call(self._metrics, "chat", model,
+                             time.perf_counter() - started, cache_hit=True,
+                             tag=tag)
+                return cached
+        cache_hit = None if cache_key is None else False
+
+        params = _completion_params(
+            messages, model, max_tokens, temperature, json_mode)
         try:
-            api_response = self._client.chat.completions.create(
-                model=model or self._default_model,
-                messages=messages,
-                max_completion_tokens=max_tokens,
-                response_format={
-                    "type": "json_object" if json_mode else "text"},
-                stream=stream,
-                temperature=temperature,
+            api_response = self._create(
+                self._client.chat.completions,
+                _completion_tokens_estimate(params),
+                **params,
+                hedge=True,
             )
-            return [
+            result = [
                 {"role": choice.message.role, "content": choice.message.content}
                 for choice in api_response.choices
             ]
         except Exception as e:
+            _record_call(self._metrics, "chat", model,
+                         time.perf_counter() - started, cache_hit=cache_hit,
+                         tag=tag, error=True)
             raise AIServiceError(f"OpenAI API error: {e}")
 
+        _record_call(self._metrics, "chat", model,
+                     time.perf_counter() - started, api_response.usage,
+                     cache_hit=cache_hit, tag=tag)
+        if cache_key is not None:
+            self._cache.set(cache_key, result)
+        return result
+
+    def stream_completion(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        tag: Optional[str] = None,
+    ) -> CompletionStream:
+        """
+        Stream a chat completion.
+
+        Args:
+            messages: Chat messages
+            model: Optional model override
+            max_tokens: Maximum number of completion tokens
+            temperature: Sampling temperature
+            json_mode: Request a JSON object response
+
+        Returns:
+            CompletionStream yielding content deltas; its `message` attribute
+            holds the aggregated reply and `time_to_first_token` the TTFT
+        """
+        if model is None and self._default_model is None:
+            raise ValueError(
+                "Model must be provided as kwarg or during client initialization"
+            )
+
+        params = _completion_params(
+            messages, model or self._default_model, max_tokens, temperature,
+            json_mode)
+        tag = tag or self._metrics_tag
+        usage = []
+
+        def deltas():
+            started = time.perf_counter()
+            api_stream = None
+            try:
+                api_stream = self._create(
+                    self._client.chat.completions,
+                    _completion_tokens_estimate(params),
+                    stream=True,
+                    stream_options={"include_usage": True},
+                    **params,
+                )
+                for chunk in api_stream:
+                    if chunk.usage:
+                        usage.append(chunk.usage)
+                    if chunk.choices:
+                        yield chunk.choices[0].delta.content
+            except Exception as e:
+                _record_call(self._metrics, "chat_stream", params["model"],
+                             time.perf_counter() - started, tag=tag,
+                             error=True)
+                raise AIServiceError(f"OpenAI API error: {e}")
+            finally:
+                # Also reached when the consumer abandons the stream
+                if api_stream is not None:
+                    api_stream.close()
+
+        def record(completion: CompletionStream):
+            _record_call(self._metrics, "chat_stream", params["model"],
+                         completion.latency, usage[-1] if usage else None,
+                         tag=tag,
+                         time_to_first_token=completion.time_to_first_token)
+
+        return CompletionStream(deltas(), on_complete=record)
+
+    def submit_batch(
+        self,
+        requests: Dict[str, list],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        jsonl_path: Optional[str] = None,
+    ) -> str:
+        """
+        Submit chat completions as one offline batch job.
+
+        Args:
+            requests: Message lists keyed by a custom id used to map results back
+            model: Optional model override
+            max_tokens: Maximum number of completion tokens
+            temperature: Sampling temperature
+            json_mode: Request a JSON object response
+            jsonl_path: Optionally keep a copy of the submitted JSONL here
+
+        Returns:
+            str: The batch id to pass to collect_batch
+        """
+        if model is None and self._default_model is None:
+            raise ValueError(
+                "Model must be provided as kwarg or during client initialization"
+            )
+
+        jsonl = build_batch_jsonl({
+            custom_id: _completion_params(
+                messages, model or self._default_model, max_tokens,
+                temperature, json_mode)
+            for custom_id, messages in requests.items()
+        })
+        if jsonl_path is not None:
+            with open(jsonl_path, "wb") as file:
+                file.write(jsonl)
+        try:
+            return self._batch_backend.submit(jsonl)
+        except Exception as e:
+            raise AIServiceError(f"OpenAI batch submit error: {e}")
+
+    def collect_batch(
+        self,
+        batch_id: str,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Union[List[OpenAIMessage], AIServiceError]]:
+        """
+        Wait for a batch job to finish and map its results back by custom id.
+
+        Args:
+            batch_id: Id returned by submit_batch
+            poll_interval: Seconds between status checks
+            timeout: Give up after this many seconds (None waits forever)
+
+        Returns:
+            Completions keyed by custom id; requests that failed inside the
+            batch map to an AIServiceError instead
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            status = self._batch_backend.status(batch_id)
+            while status not in FINAL_STATUSES:
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise AIServiceError(
+                        f"Batch {batch_id} still {status} after {timeout}s")
+                time.sleep(poll_interval)
+                status = self._batch_backend.status(batch_id)
+            lines = self._batch_backend.results(batch_id)
+        except AIServiceError:
+            raise
+        except Exception as e:
+            raise AIServiceError(f"OpenAI batch error: {e}")
+
+        if status != "completed" and not lines:
+            raise AIServiceError(f"Batch {batch_id} ended as {status}")
+
+        results = {}
+        for line in lines:
+            error = response_error(line)
+            if error is not None:
+                results[line["custom_id"]] = AIServiceError(error)
+                continue
+            results[line["custom_id"]] = [
+                {"role": choice["message"]["role"],
+                 "content": choice["message"]["content"]}
+                for choice in line["response"]["body"]["choices"]
+            ]
+        return results
+
     def text_embedding(
         self,
-        payload: str,
+        payload: Union[str, List[str]],
         model: Literal[
             "text-embedding-3-small", "text-embedding-3-large"
         ] = "text-embedding-3-small",
+        tag: Optional[str] = None,
     ):
+        if isinstance(payload, list):
+            return self.text_embedding_many(payload, model=model, tag=tag)
+
+        tag = tag or self._metrics_tag
+        started = time.perf_counter()
+
         try:
-            api_response = self._client.embeddings.create(
-                model=model, input=payload)
-            return api_response.data[0].embedding
+            api_response = self._create(
+                self._client.embeddings,
+                lambda: embedding_token_counter(model)(payload),
+                model=model,
+                input=payload,
+            )
+            embedding = api_response.data[0].embedding
         except (AttributeError, IndexError):
             raise AIServiceError("Invalid API response")
         except Exception as e:
+            _record_call(self._metrics, "embedding", model,
+                         time.perf_counter() - started, tag=tag, error=True)
             raise AIServiceError(f"OpenAI API error: {e}")
 
+        _record_call(self._metrics, "embedding", model,
+                     time.perf_counter() - started, api_response.usage, tag=tag)
+        return embedding
+
+    def text_embedding_many(
+        self,
+        payloads: List[str],
+        model: Literal[
+            "text-embedding-3-small", "text-embedding-3-large"
+        ] = "text-embedding-3-small",
+        max_workers: int = 4,
+        tag: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Embed many texts with as few requests as the API limits allow.
+
+        Args:
+            payloads: Texts to embed
+            model: Embedding model
+            max_workers: Number of requests sent concurrently
+            tag: Metrics tag for the requests
+
+        Returns:
+            float32 array of shape (len(payloads), dimensions), rows in input order
+        """
+        if not payloads:
+            return np.empty((0, 0), dtype=np.float32)
+        try:
+            batches = plan_embedding_batches(
+                payloads, embedding_token_counter(model))
+        except ValueError as e:
+            raise AIServiceError(str(e))
+        tag = tag or self._metrics_tag
+
+        def embed(batch: EmbeddingBatch) -> np.ndarray:
+            started = time.perf_counter()
+            try:
+                api_response = self._create(
+                    self._client.embeddings,
+                    lambda: batch.tokens,
+                    model=model,
+                    input=payloads[batch.start:batch.stop],
+                )
+                rows = sorted(api_response.data, key=lambda item: item.index)
+                matrix = np.asarray(
+                    [row.embedding for row in rows], dtype=np.float32)
+            except (AttributeError, IndexError):
+                raise AIServiceError("Invalid API response")
+            except Exception as e:
+                _record_call(self._metrics, "embedding", model,
+                             time.perf_counter() - started, tag=tag, error=True)
+                raise AIServiceError(f"OpenAI API error: {e}")
+
+            _record_call(self._metrics, "embedding", model,
+                         time.perf_counter() - started, api_response.usage,
+                         tag=tag)
+            return matrix
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            matrices = list(executor.map(embed, batches))
+        return np.ascontiguousarray(np.concatenate(matrices), dtype=np.float32)
+
     def speak(self, text: str) -> bytes:
         """
         Convert text to speech using OpenAI's TTS API.
@@ -76,16 +490,27 @@ class OpenAIService(AIServiceBase):
         Returns:
             bytes: The audio data in bytes
         """
+        started = time.perf_counter()
         try:
-            response = self._client.audio.speech.create(
+            # Never hedged, every duplicate speech request is billed
+            response = self._create(
+                self._client.audio.speech,
+                # Speech and transcription models are limited by requests only
+                lambda: 0,
                 model="tts-1",
                 voice="alloy",
                 input=text
             )
-            return response.content
         except Exception as e:
+            _record_call(self._metrics, "speech", "tts-1",
+                         time.perf_counter() - started,
+                         tag=self._metrics_tag, error=True)
             raise AIServiceError(f"OpenAI TTS API error: {e}")
 
+        _record_call(self._metrics, "speech", "tts-1",
+                     time.perf_counter() - started, tag=self._metrics_tag)
+        return response.content
+
     def transcribe(self, audio_data: BinaryIO, language: str = 'pl') -> str:
         """
         Transcribe audio data to text using OpenAI's Whisper API.
@@ -97,12 +522,410 @@ class OpenAIService(AIServiceBase):
         Returns:
             str: The transcribed text
         """
+        rewind = _rewind(audio_data)
+
+        started = time.perf_counter()
         try:
-            transcription = self._client.audio.transcriptions.create(
+            transcription = self._create(
+                self._client.audio.transcriptions,
+                lambda: 0,
+                before_attempt=rewind,
                 file=audio_data,
                 language=language,
                 model="whisper-1"
             )
-            return transcription.text
         except Exception as e:
+            _record_call(self._metrics, "transcription", "whisper-1",
+                         time.perf_counter() - started,
+                         tag=self._metrics_tag, error=True)
             raise AIServiceError(f"OpenAI transcription API error: {e}")
+
+        _record_call(self._metrics, "transcription", "whisper-1",
+                     time.perf_counter() - started, tag=self._metrics_tag)
+        return transcription.text
+
+
+class AsyncOpenAIService(AIServiceBase):
+    """
+    Asynchronous counterpart of OpenAIService.
+
+    All calls share one semaphore, so at most `max_concurrency` requests are
+    in flight at any time, no matter how many coroutines are awaiting.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        default_model="gpt-4o-mini",
+        max_concurrency: int = 8,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        base_url: Optional[str] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        metrics_tag: Optional[str] = None,
+    ):
+        if api_key is None:
+            load_dotenv()
+            api_key = os.getenv("OPENAI_API_KEY")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._api_key = api_key
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0 if retry_policy else DEFAULT_MAX_RETRIES,
+        )
+        self._default_model = default_model
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache = cache
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        self._hedge_policy = hedge_policy
+        self._metrics = metrics or registry
+        self._metrics_tag = metrics_tag
+
+    async def _create(
+        self,
+        endpoint,
+        estimate_tokens: Callable[[], int],
+        hedge: bool = False,
+        before_attempt: Optional[Callable[[], None]] = None,
+        **params,
+    ):
+        """
+        Await `endpoint.create` with the rate limiter, retry and hedging policies.
+
+        Called while holding the concurrency semaphore. Only the HTTP request
+        is hedged, after the rate limiter admitted the attempt, and the
+        duplicate request takes a semaphore slot of its own.
+        """
+        async def request():
+            if self._rate_limiter is None:
+                return await endpoint.create(**params)
+            raw_response = await endpoint.with_raw_response.create(**params)
+            self._rate_limiter.update_from_headers(
+                params["model"], raw_response.headers)
+            return raw_response.parse()
+
+        async def duplicate():
+            async with self._semaphore:
+                return await request()
+
+        async def attempt():
+            if before_attempt is not None:
+                before_attempt()
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire_async(
+                    params["model"], estimate_tokens())
+            if hedge and self._hedge_policy is not None:
+                return await async_call_hedged(
+                    request, self._hedge_policy, duplicate)
+            return await request()
+
+        if self._retry_policy is None:
+            return await attempt()
+        return await async_call_with_retry(attempt, self._retry_policy)
+
+    async def text_completion(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        tag: Optional[str] = None,
+    ) -> List[OpenAIMessage]:
+        if model is None and self._default_model is None:
+            raise ValueError(
+                "Model must be provided as kwarg or during client initialization"
+            )
+
+        model = model or self._default_model
+        tag = tag or self._metrics_tag
+        started = time.perf_counter()
+        cache_key = None
+        if self._cache is not None:
+            cache_key = self._cache.make_key(
+                model, messages, temperature, max_tokens, json_mode)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                _record_call(self._metrics, "chat", model,
+                             time.perf_counter() - started, cache_hit=True,
+                             tag=tag)
+                return cached
+        cache_hit = None if cache_key is None else False
+
+        params = _completion_params(
+            messages, model, max_tokens, temperature, json_mode)
+        async with self._semaphore:
+            try:
+                api_response = await self._create(
+                    self._client.chat.completions,
+                    _completion_tokens_estimate(params),
+                    **params,
+                    hedge=True,
+                )
+                result = [
+                    {"role": choice.message.role,
+                     "content": choice.message.content}
+                    for choice in api_response.choices
+                ]
+            except Exception as e:
+                _record_call(self._metrics, "chat", model,
+                             time.perf_counter() - started,
+                             cache_hit=cache_hit, tag=tag, error=True)
+                raise AIServiceError(f"OpenAI API error: {e}")
+
+        _record_call(self._metrics, "chat", model,
+                     time.perf_counter() - started, api_response.usage,
+                     cache_hit=cache_hit, tag=tag)
+        if cache_key is not None:
+            self._cache.set(cache_key, result)
+        return result
+
+    def stream_completion(
+        self,
+        messages: list,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False,
+        tag: Optional[str] = None,
+    ) -> AsyncCompletionStream:
+        """
+        Stream a chat completion.
+
+        The request is sent when iteration starts and holds a concurrency slot
+        until the stream is exhausted.
+
+        Returns:
+            AsyncCompletionStream yielding content deltas; await its
+            `get_message()` for the aggregated reply
+        """
+        if model is None and self._default_model is None:
+            raise ValueError(
+                "Model must be provided as kwarg or during client initialization"
+            )
+
+        params = _completion_params(
+            messages, model or self._default_model, max_tokens, temperature,
+            json_mode)
+        tag = tag or self._metrics_tag
+        usage = []
+
+        async def deltas():
+            async with self._semaphore:
+                started = time.perf_counter()
+                api_stream = None
+                try:
+                    api_stream = await self._create(
+                        self._client.chat.completions,
+                        _completion_tokens_estimate(params),
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **params,
+                    )
+                    async for chunk in api_stream:
+                        if chunk.usage:
+                            usage.append(chunk.usage)
+                        if chunk.choices:
+                            yield chunk.choices[0].delta.content
+                except Exception as e:
+                    _record_call(self._metrics, "chat_stream", params["model"],
+                                 time.perf_counter() - started, tag=tag,
+                                 error=True)
+                    raise AIServiceError(f"OpenAI API error: {e}")
+                finally:
+                    # Also reached when the consumer abandons the stream
+                    if api_stream is not None:
+                        await api_stream.close()
+
+        def record(completion: AsyncCompletionStream):
+            _record_call(self._metrics, "chat_stream", params["model"],
+                         completion.latency, usage[-1] if usage else None,
+                         tag=tag,
+                         time_to_first_token=completion.time_to_first_token)
+
+        return AsyncCompletionStream(deltas(), on_complete=record)
+
+    async def text_completion_many(
+        self,
+        messages_list: List[list],
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> List[List[OpenAIMessage]]:
+        """
+        Run many chat completions concurrently.
+
+        Args:
+            messages_list: One message list per completion
+            return_exceptions: If True, failed calls yield their AIServiceError
+                in place of a result instead of aborting the whole batch
+            **kwargs: Passed to text_completion for every call
+
+        Returns:
+            List of completions in the same order as `messages_list`
+        """
+        return await asyncio.gather(
+            *(self.text_completion(messages, **kwargs)
+              for messages in messages_list),
+            return_exceptions=return_exceptions,
+        )
+
+    async def text_embedding(
+        self,
+        payload: Union[str, List[str]],
+        model: Literal[
+            "text-embedding-3-small", "text-embedding-3-large"
+        ] = "text-embedding-3-small",
+        tag: Optional[str] = None,
+    ):
+        if isinstance(payload, list):
+            return await self.text_embedding_many(payload, model=model, tag=tag)
+
+        tag = tag or self._metrics_tag
+        started = time.perf_counter()
+
+        async with self._semaphore:
+            try:
+                api_response = await self._create(
+                    self._client.embeddings,
+                    lambda: embedding_token_counter(model)(payload),
+                    model=model,
+                    input=payload,
+                )
+                embedding = api_response.data[0].embedding
+            except (AttributeError, IndexError):
+                raise AIServiceError("Invalid API response")
+            except Exception as e:
+                _record_call(self._metrics, "embedding", model,
+                             time.perf_counter() - started, tag=tag, error=True)
+                raise AIServiceError(f"OpenAI API error: {e}")
+
+        _record_call(self._metrics, "embedding", model,
+                     time.perf_counter() - started, api_response.usage, tag=tag)
+        return embedding
+
+    async def text_embedding_many(
+        self,
+        payloads: List[str],
+        model: Literal[
+            "text-embedding-3-small", "text-embedding-3-large"
+        ] = "text-embedding-3-small",
+        tag: Optional[str] = None,
+    ) -> np.ndarray:
+        """
+        Embed many texts with as few requests as the API limits allow.
+
+        Batches are sent concurrently, within the service concurrency limit.
+
+        Returns:
+            float32 array of shape (len(payloads), dimensions), rows in input order
+        """
+        if not payloads:
+            return np.empty((0, 0), dtype=np.float32)
+        try:
+            batches = plan_embedding_batches(
+                payloads, embedding_token_counter(model))
+        except ValueError as e:
+            raise AIServiceError(str(e))
+        tag = tag or self._metrics_tag
+
+        async def embed(batch: EmbeddingBatch) -> np.ndarray:
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    api_response = await self._create(
+                        self._client.embeddings,
+                        lambda: batch.tokens,
+                        model=model,
+                        input=payloads[batch.start:batch.stop],
+                    )
+                    rows = sorted(api_response.data,
+                                  key=lambda item: item.index)
+                    matrix = np.asarray(
+                        [row.embedding for row in rows], dtype=np.float32)
+                except (AttributeError, IndexError):
+                    raise AIServiceError("Invalid API response")
+                except Exception as e:
+                    _record_call(self._metrics, "embedding", model,
+                                 time.perf_counter() - started, tag=tag,
+                                 error=True)
+                    raise AIServiceError(f"OpenAI API error: {e}")
+
+            _record_call(self._metrics, "embedding", model,
+                         time.perf_counter() - started, api_response.usage,
+                         tag=tag)
+            return matrix
+
+        matrices = await asyncio.gather(*(embed(batch) for batch in batches))
+        return np.ascontiguousarray(np.concatenate(matrices), dtype=np.float32)
+
+    async def speak(self, text: str) -> bytes:
+        """
+        Convert text to speech using OpenAI's TTS API.
+
+        Args:
+            text: The text to convert to speech
+
+        Returns:
+            bytes: The audio data in bytes
+        """
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                # Never hedged, every duplicate speech request is billed
+                response = await self._create(
+                    self._client.audio.speech,
+                    # Speech and transcription models are limited by requests only
+                    lambda: 0,
+                    model="tts-1",
+                    voice="alloy",
+                    input=text
+                )
+            except Exception as e:
+                _record_call(self._metrics, "speech", "tts-1",
+                             time.perf_counter() - started,
+                             tag=self._metrics_tag, error=True)
+                raise AIServiceError(f"OpenAI TTS API error: {e}")
+
+        _record_call(self._metrics, "speech", "tts-1",
+                     time.perf_counter() - started, tag=self._metrics_tag)
+        return response.content
+
+    async def transcribe(self, audio_data: BinaryIO, language: str = 'pl') -> str:
+        """
+        Transcribe audio data to text using OpenAI's Whisper API.
+
+        Args:
+            audio_data: Binary audio data (file-like object)
+            language: Language code for transcription (default: 'pl' for Polish)
+
+        Returns:
+            str: The transcribed text
+        """
+        rewind = _rewind(audio_data)
+
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                transcription = await self._create(
+                    self._client.audio.transcriptions,
+                    lambda: 0,
+                    before_attempt=rewind,
+                    file=audio_data,
+                    language=language,
+                    model="whisper-1"
+                )
+            except Exception as e:
+                _record_call(self._metrics, "transcription", "whisper-1",
+                             time.perf_counter() - started,
+                             tag=self._metrics_tag, error=True)
+                raise AIServiceError(
+                    f"OpenAI transcription API error: {e}")
+
+        _record_call(self._metrics, "transcription", "whisper-1",
+                     time.perf_counter() - started, tag=self._metrics_tag)
+        return transcription.text
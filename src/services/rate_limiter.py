@@ -0,0 +1,141 @@
+import asyncio
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """Parse OpenAI reset durations such as '1s', '6m0s' or '20ms' to seconds."""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of refusing requests.
+
+    `reserve` always succeeds and returns how long the caller has to wait
+    before its reservation is covered. The level may go negative, so
+    concurrent callers are queued one behind another at the refill rate.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._level = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self._level = min(
+            self.capacity,
+            self._level + (now - self._updated) * self.refill_per_second,
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        # A single request larger than the bucket would never fit; let it
+        # through once the bucket is full instead of waiting forever.
+        amount = min(amount, self.capacity)
+        self._level -= amount
+        if self._level >= 0:
+            return 0.0
+        return -self._level / self.refill_per_second
+
+    def sync(self, limit: Optional[float], remaining: Optional[float],
+             reset_seconds: Optional[float]):
+        """Align the bucket with the budget reported by the server."""
+        now = time.monotonic()
+        self._refill(now)
+        if limit:
+            self.capacity = limit
+            self.refill_per_second = limit / 60.0
+        if remaining is not None:
+            # The server also counts other clients sharing the key, so only
+            # ever tighten the local estimate.
+            self._level = min(self._level, remaining)
+        if reset_seconds and self._level < self.capacity:
+            self.refill_per_second = max(
+                self.refill_per_second,
+                (self.capacity - self._level) / reset_seconds,
+            )
+
+
+class RateLimiter:
+    """
+    Request-per-minute and token-per-minute limiter shared by service calls.
+
+    OpenAI enforces its limits per model, so every model gets its own pair
+    of buckets, created with the initial limits on first use and refined
+    from the `x-ratelimit-*` headers of that model's responses. One instance
+    can be passed to several services (sync and async) to make them share
+    the same budgets.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+
+    def _buckets_for(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        buckets = self._buckets.get(model)
+        if buckets is None:
+            buckets = self._buckets[model] = (
+                TokenBucket(self.requests_per_minute,
+                            self.requests_per_minute / 60.0),
+                TokenBucket(self.tokens_per_minute,
+                            self.tokens_per_minute / 60.0),
+            )
+        return buckets
+
+    def reserve(self, model: str, tokens: int) -> float:
+        """Book one request of `tokens` tokens to `model`. Returns the delay in seconds."""
+        with self._lock:
+            requests, token_bucket = self._buckets_for(model)
+            return max(requests.reserve(1), token_bucket.reserve(tokens))
+
+    def acquire(self, model: str, tokens: int):
+        """Block until a request of `tokens` tokens may be sent to `model`."""
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, model: str, tokens: int):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        delay = self.reserve(model, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_from_headers(self, model: str, headers: Mapping[str, str]):
+        """Align the buckets of `model` with the limits reported in a response."""
+        def number(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        with self._lock:
+            requests, token_bucket = self._buckets_for(model)
+            requests.sync(
+                number("x-ratelimit-limit-requests"),
+                number("x-ratelimit-remaining-requests"),
+                parse_reset_duration(headers.get("x-ratelimit-reset-requests")),
+            )
+            token_bucket.sync(
+                number("x-ratelimit-limit-tokens"),
+                number("x-ratelimit-remaining-tokens"),
+                parse_reset_duration(headers.get("x-ratelimit-reset-tokens")),
+            )
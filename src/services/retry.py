@@ -0,0 +1,216 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import openai
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Longer server-requested waits are ignored in favour of the backoff, as the SDK does
+MAX_RETRY_AFTER = 60.0
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an OpenAI SDK error is transient and worth retrying."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the server asked to wait in the retry-after(-ms) header of an error response."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # HTTP date
+            return email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """
+    Retry with exponential backoff and full jitter.
+
+    Attempt n (counting from 0) waits a random time between 0 and
+    min(max_delay, base_delay * 2**n) before the next try, unless the error
+    response carries a retry-after(-ms) header of at most MAX_RETRY_AFTER
+    seconds, which is honoured instead.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retry_on: Callable[[BaseException], bool] = is_retryable,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        requested = retry_after(error) if error is not None else None
+        if requested is not None and 0 <= requested <= MAX_RETRY_AFTER:
+            return requested
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return attempt + 1 < self.max_attempts and self.retry_on(error)
+
+
+def call_with_retry(request: Callable[[], T], policy: RetryPolicy) -> T:
+    attempt = 0
+    while True:
+        try:
+            return request()
+        except Exception as e:
+            if not policy.should_retry(e, attempt):
+                raise
+            time.sleep(policy.delay(attempt, e))
+            attempt += 1
+
+
+async def async_call_with_retry(
+    request: Callable[[], Awaitable[T]], policy: RetryPolicy
+) -> T:
+    attempt = 0
+    while True:
+        try:
+            return await request()
+        except Exception as e:
+            if not policy.should_retry(e, attempt):
+                raise
+            await asyncio.sleep(policy.delay(attempt, e))
+            attempt += 1
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgePolicy:
+    """
+    Send a duplicate request when the first one is slower than usual.
+
+    The hedge fires once the primary request has been running longer than
+    the `percentile` latency of recent requests. Hedging starts only after
+    `min_samples` latencies have been observed.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        min_samples: int = 20,
+        min_delay: float = 0.5,
+        window: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latencies = LatencyTracker(window)
+
+    def threshold(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latencies.percentile(self.percentile))
+
+
+def call_hedged(request: Callable[[], T], policy: HedgePolicy, executor: Executor) -> T:
+    started = time.perf_counter()
+    threshold = policy.threshold()
+    if threshold is None:
+        result = request()
+        policy.latencies.record(time.perf_counter() - started)
+        return result
+
+    pending = {executor.submit(request)}
+    done, _ = wait(pending, timeout=threshold)
+    if not done:
+        pending.add(executor.submit(request))
+
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                policy.latencies.record(time.perf_counter() - started)
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def async_call_hedged(
+    request: Callable[[], Awaitable[T]],
+    policy: HedgePolicy,
+    duplicate: Optional[Callable[[], Awaitable[T]]] = None,
+) -> T:
+    """
+    Await `request()`, racing it with `duplicate()` (by default `request()`)
+    once it is slower than the policy threshold.
+    """
+    started = time.perf_counter()
+    threshold = policy.threshold()
+    if threshold is None:
+        result = await request()
+        policy.latencies.record(time.perf_counter() - started)
+        return result
+
+    pending = {asyncio.ensure_future(request())}
+    done, _ = await asyncio.wait(pending, timeout=threshold)
+    if not done:
+        pending.add(asyncio.ensure_future((duplicate or request)()))
+
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    policy.latencies.record(time.perf_counter() - started)
+                    return task.result()
+                error = task.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+    raise error
@@ -0,0 +1,142 @@
+import time
+from typing import AsyncIterator, Callable, Iterator, List, Optional
+
+from src.types.completion import Message
+
+
+class CompletionStream:
+    """
+    Iterator over the content deltas of a streamed completion.
+
+    The underlying request is only sent when iteration starts. Once the
+    stream is exhausted, `message` holds the aggregated reply and
+    `time_to_first_token`/`latency` hold the timings in seconds.
+
+    A stream abandoned before its end is closed as soon as its iterator is
+    (or on `close()`), which closes the deltas iterator and reports the
+    partial stream to `on_complete`. Failures are left to the deltas
+    iterator to report.
+    """
+
+    def __init__(
+        self,
+        deltas: Iterator[str],
+        role: str = "assistant",
+        on_complete: Optional[Callable[["CompletionStream"], None]] = None,
+    ):
+        self._deltas = deltas
+        self._parts: List[str] = []
+        self._on_complete = on_complete
+        self.role = role
+        self.started: Optional[float] = None
+        self.time_to_first_token: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.done = False
+
+    def __iter__(self) -> Iterator[str]:
+        if self.started is None:
+            self.started = time.perf_counter()
+        try:
+            for delta in self._deltas:
+                if not delta:
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - self.started
+                self._parts.append(delta)
+                yield delta
+        except Exception:
+            self.done = True
+            raise
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the stream, releasing the underlying request."""
+        close = getattr(self._deltas, "close", None)
+        if close is not None:
+            close()
+        if self.started is not None:
+            self._finish()
+
+    def _finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.latency = time.perf_counter() - self.started
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+    @property
+    def content(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def message(self) -> Message:
+        """The aggregated message. Consumes the rest of the stream if needed."""
+        if not self.done:
+            for _ in self:
+                pass
+        return {"role": self.role, "content": self.content}
+
+
+class AsyncCompletionStream:
+    """Async counterpart of CompletionStream, consumed with `async for`."""
+
+    def __init__(
+        self,
+        deltas: AsyncIterator[str],
+        role: str = "assistant",
+        on_complete: Optional[Callable[["AsyncCompletionStream"], None]] = None,
+    ):
+        self._deltas = deltas
+        self._parts: List[str] = []
+        self._on_complete = on_complete
+        self.role = role
+        self.started: Optional[float] = None
+        self.time_to_first_token: Optional[float] = None
+        self.latency: Optional[float] = None
+        self.done = False
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        if self.started is None:
+            self.started = time.perf_counter()
+        try:
+            async for delta in self._deltas:
+                if not delta:
+                    continue
+                if self.time_to_first_token is None:
+                    self.time_to_first_token = time.perf_counter() - self.started
+                self._parts.append(delta)
+                yield delta
+        except Exception:
+            self.done = True
+            raise
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        """Stop the stream, releasing the underlying request."""
+        aclose = getattr(self._deltas, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        if self.started is not None:
+            self._finish()
+
+    def _finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.latency = time.perf_counter() - self.started
+        if self._on_complete is not None:
+            self._on_complete(self)
+
+    @property
+    def content(self) -> str:
+        return "".join(self._parts)
+
+    async def get_message(self) -> Message:
+        """The aggregated message. Consumes the rest of the stream if needed."""
+        if not self.done:
+            async for _ in self:
+                pass
+        return {"role": self.role, "content": self.content}
@@ -0,0 +1,59 @@
+"""
+Process-wide tokenizer registry.
+
+tiktoken is imported on first use and each model's encoding is loaded once
+per process. Token counts of short strings (prompts, headers, chat-format
+wrappers) are memoized, since the same ones are counted over and over.
+"""
+from functools import lru_cache
+from typing import List
+
+# Fallback for models tiktoken does not know about yet
+DEFAULT_ENCODING = "o200k_base"
+
+# Longest text whose token count is memoized
+SHORT_TEXT_LENGTH = 512
+
+
+@lru_cache(maxsize=None)
+def encoding_for_model(model: str):
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+
+@lru_cache(maxsize=8192)
+def _count_short_text_tokens(text: str, model: str) -> int:
+    return len(encoding_for_model(model).encode(text, disallowed_special=()))
+
+
+def count_tokens(text: str, model: str) -> int:
+    if len(text) <= SHORT_TEXT_LENGTH:
+        return _count_short_text_tokens(text, model)
+    return len(encoding_for_model(model).encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[dict], model: str) -> int:
+    """
+    Estimate the prompt tokens of a chat request.
+
+    Follows the OpenAI cookbook rule of thumb: 3 tokens of framing per
+    message plus 3 tokens priming the reply. Non-text content parts
+    (e.g. images) are not counted.
+    """
+    total = 3
+    for message in messages:
+        total += 3
+        for value in message.values():
+            if isinstance(value, str):
+                total += count_tokens(value, model)
+            elif isinstance(value, list):
+                total += sum(
+                    count_tokens(part.get("text", ""), model)
+                    for part in value
+                    if isinstance(part, dict)
+                )
+    return total
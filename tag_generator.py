@@ -32,7 +32,8 @@ class KeywordExtractor:
             ]
 
             # Call the text_completion method from OpenAIService
-            completion = self.openai_client.text_completion(messages)
+            completion = self.openai_client.text_completion(
+                messages, tag="keywords")
 
             # Extract and return the response for the current content
             # Assuming the completion returns a list of OpenAIMessage
@@ -66,7 +67,8 @@ class KeywordExtractor:
                  """},
                 {"role": "user", "content": content}
             ]
-            completion = self.openai_client.text_completion(messages)
+            completion = self.openai_client.text_completion(
+                messages, tag="persons")
             persons = "\n".join([msg['content'] for msg in completion])
             return persons
 
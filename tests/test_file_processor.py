@@ -0,0 +1,78 @@
+import pytest
+
+from file_processor import FileProcessor, ResultManager
+from image_preprocessor import ImagePreprocessor
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("some text")
+    return str(path)
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "picture.png"
+    path.write_bytes(b"not really a png")
+    return str(path)
+
+
+class CountingProcessor(FileProcessor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def _result(self, path):
+        self.calls.append(path)
+        return f"{self.default_text_model}:{self.default_vision_model}"
+
+    def process_text(self, file_path, model=None):
+        return self._result(file_path)
+
+    def process_vision(self, file_path, model=None):
+        return self._result(file_path)
+
+
+def test_cache_key_follows_content_model_and_prompt(document):
+    key = ResultManager.cache_key(FileProcessor(), document, "text")
+    assert key == ResultManager.cache_key(FileProcessor(), document, "text")
+    assert key != ResultManager.cache_key(
+        FileProcessor(default_text_model="gpt-4o-mini"), document, "text")
+
+    with open(document, "a") as file:
+        file.write(" edited")
+    assert key != ResultManager.cache_key(FileProcessor(), document, "text")
+
+
+def test_cache_key_follows_image_preprocessing(image, tmp_path):
+    def key(**settings):
+        preprocessor = ImagePreprocessor(cache_dir=str(tmp_path), **settings)
+        return ResultManager.cache_key(
+            FileProcessor(image_preprocessor=preprocessor), image, "image")
+
+    assert key() == key()
+    assert key() != key(detail="low")
+    assert key() != key(format="JPEG")
+    assert key() != key(quality=50)
+
+
+def test_changed_model_reprocesses_stored_results(tmp_path, document):
+    sorted_files = {".txt": [document]}
+
+    def run(processor):
+        manager = ResultManager(
+            base_name=str(tmp_path / "results"), cache_path=None)
+        results = dict(manager.process_files(processor, sorted_files))
+        return processor.calls, results
+
+    assert len(run(CountingProcessor())[0]) == 1
+    assert run(CountingProcessor())[0] == []
+    calls, results = run(CountingProcessor(default_text_model="gpt-4o-mini"))
+    assert len(calls) == 1
+    assert next(iter(results.values())).startswith("gpt-4o-mini")
@@ -0,0 +1,25 @@
+import pytest
+from PIL import Image
+
+from image_preprocessor import HIGH_DETAIL_SHORT_SIDE, ImagePreprocessor
+
+
+def test_large_image_is_downscaled_and_cached(tmp_path):
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (4000, 3000), "white").save(source)
+    preprocessor = ImagePreprocessor(cache_dir=str(tmp_path / "cache"))
+
+    prepared = preprocessor.prepare(str(source))
+    assert prepared.mime_type == "image/webp"
+    assert prepared.detail == "high"
+    assert min(prepared.width, prepared.height) == HIGH_DETAIL_SHORT_SIDE
+    assert prepared.data_url().startswith("data:image/webp;base64,")
+    assert preprocessor.prepare(str(source)) == prepared
+
+
+def test_svg_is_rejected(tmp_path):
+    source = tmp_path / "diagram.svg"
+    source.write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+
+    with pytest.raises(ValueError, match="image/svg"):
+        ImagePreprocessor(cache_dir=str(tmp_path / "cache")).prepare(str(source))
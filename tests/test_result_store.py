@@ -0,0 +1,61 @@
+import pytest
+
+from result_store import (
+    JsonlResultStore,
+    JsonResultStore,
+    SqliteResultStore,
+    open_result_store,
+)
+
+
+@pytest.mark.parametrize("name", ["results.json", "results.sqlite", "results.jsonl"])
+def test_results_survive_reopen(tmp_path, name):
+    path = str(tmp_path / name)
+    with open_result_store(path) as store:
+        store.put("b.txt", {"text": "second"})
+        store.put("a.txt", "first")
+        store.put_many([("c.txt", [1, 2]), ("a.txt", "first, redone")])
+
+    with open_result_store(path) as store:
+        assert list(store) == ["a.txt", "b.txt", "c.txt"]
+        assert store["a.txt"] == "first, redone"
+        assert store["b.txt"] == {"text": "second"}
+        assert "missing.txt" not in store
+        with pytest.raises(KeyError):
+            store["missing.txt"]
+
+
+def test_store_kind_follows_extension(tmp_path):
+    assert isinstance(open_result_store(str(tmp_path / "r.json")), JsonResultStore)
+    assert isinstance(open_result_store(str(tmp_path / "r.db")), SqliteResultStore)
+    assert isinstance(open_result_store(str(tmp_path / "r.jsonl")), JsonlResultStore)
+
+
+def test_jsonl_store_drops_torn_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with JsonlResultStore(str(path)) as store:
+        store.put("a.txt", "first")
+        store.put("b.txt", "second")
+    intact = path.stat().st_size
+    with open(path, "ab") as file:
+        file.write(b'{"key": "c.txt", "value": "thi')
+
+    with JsonlResultStore(str(path)) as store:
+        assert dict(store) == {"a.txt": "first", "b.txt": "second"}
+        assert path.stat().st_size == intact
+        store.put("c.txt", "third")
+
+    with JsonlResultStore(str(path)) as store:
+        assert store["c.txt"] == "third"
+
+
+def test_jsonl_store_compacts_superseded_lines(tmp_path):
+    path = tmp_path / "results.jsonl"
+    with JsonlResultStore(str(path), compact_after=3) as store:
+        for i in range(10):
+            store.put("a.txt", i)
+        store.put("b.txt", "b")
+    assert len(path.read_bytes().splitlines()) < 11
+
+    with JsonlResultStore(str(path)) as store:
+        assert dict(store) == {"a.txt": 9, "b.txt": "b"}
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import openai as openai_service
+from src.services.mock_server import LatencyModel, MockOpenAIServer
+from src.services.openai import AsyncOpenAIService, OpenAIService
+from src.services.rate_limiter import RateLimiter
+from src.services.retry import HedgePolicy, RetryPolicy
+
+MODEL = "gpt-4o-mini"
+
+
+@pytest.fixture(autouse=True)
+def fixed_token_estimate(monkeypatch):
+    # Keeps the tests offline; tiktoken would download its encodings
+    monkeypatch.setattr(openai_service, "count_message_tokens",
+                        lambda messages, model: 10)
+
+
+def warm_hedge_policy(latency: float = 0.01) -> HedgePolicy:
+    policy = HedgePolicy(min_samples=5, min_delay=0.05)
+    for _ in range(5):
+        policy.latencies.record(latency)
+    return policy
+
+
+def drained_limiter(requests_per_minute: float) -> RateLimiter:
+    limiter = RateLimiter(requests_per_minute=requests_per_minute)
+    for _ in range(int(requests_per_minute)):
+        limiter.reserve(MODEL, 0)
+    return limiter
+
+
+def messages(i: int) -> list:
+    return [{"role": "user", "content": f"question {i}"}]
+
+
+def test_waiting_for_rate_limiter_does_not_hedge():
+    with MockOpenAIServer() as server:
+        service = OpenAIService(
+            api_key="sk-test", base_url=server.base_url,
+            rate_limiter=drained_limiter(600),
+            hedge_policy=warm_hedge_policy())
+        for i in range(5):
+            service.text_completion(messages(i), model=MODEL)
+        assert server.requests_served == 5
+
+
+def test_slow_request_is_hedged():
+    with MockOpenAIServer(latency=LatencyModel("constant", 0.3)) as server:
+        service = OpenAIService(
+            api_key="sk-test", base_url=server.base_url,
+            rate_limiter=RateLimiter(),
+            hedge_policy=warm_hedge_policy())
+        service.text_completion(messages(0), model=MODEL)
+        assert server.requests_served == 2
+
+
+def test_async_hedge_stays_within_concurrency_limit():
+    with MockOpenAIServer(latency=LatencyModel("constant", 0.3)) as server:
+        service = AsyncOpenAIService(
+            api_key="sk-test", base_url=server.base_url, max_concurrency=1,
+            hedge_policy=warm_hedge_policy())
+
+        async def run():
+            await asyncio.gather(*(
+                service.text_completion(messages(i), model=MODEL)
+                for i in range(3)))
+
+        asyncio.run(run())
+        # With a single slot the duplicate can only start once the primary
+        # finished, so it is never sent
+        assert server.requests_served == 3
+
+
+def test_retry_policy_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.01)
+
+    def error(headers):
+        return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+    assert policy.delay(0, error({"retry-after-ms": "1500"})) == 1.5
+    assert policy.delay(0, error({"retry-after": "20"})) == 20.0
+    assert policy.delay(0, error({"retry-after": "3600"})) <= 0.01
+    assert policy.delay(0, error({})) <= 0.01
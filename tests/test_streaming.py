@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src.services import openai as openai_service
+from src.services.metrics import MetricsRegistry
+from src.services.mock_server import MockOpenAIServer
+from src.services.ollama import OllamaService
+from src.services.openai import AsyncOpenAIService, OpenAIService
+
+MESSAGES = [{"role": "user", "content": "tell me a long story"}]
+
+
+@pytest.fixture(autouse=True)
+def fixed_token_estimate(monkeypatch):
+    monkeypatch.setattr(openai_service, "count_message_tokens",
+                        lambda messages, model: 10)
+
+
+def stream_records(metrics: MetricsRegistry) -> list:
+    return [call for call in metrics.calls if call["operation"] == "chat_stream"]
+
+
+def test_abandoned_stream_records_metrics():
+    metrics = MetricsRegistry()
+    with MockOpenAIServer() as server:
+        service = OpenAIService(
+            api_key="sk-test", base_url=server.base_url, metrics=metrics)
+        stream = service.stream_completion(MESSAGES)
+        for _ in stream:
+            break
+
+        [record] = stream_records(metrics)
+        assert not record["error"]
+        assert record["time_to_first_token"] is not None
+        assert stream.done
+
+
+def test_abandoned_async_stream_releases_its_slot():
+    metrics = MetricsRegistry()
+    with MockOpenAIServer() as server:
+        service = AsyncOpenAIService(
+            api_key="sk-test", base_url=server.base_url, max_concurrency=1,
+            metrics=metrics)
+
+        async def run():
+            stream = service.stream_completion(MESSAGES)
+            async for _ in stream:
+                break
+            await stream.aclose()
+            # Would wait forever if the stream still held the only slot
+            await asyncio.wait_for(service.text_completion(MESSAGES), 5)
+
+        asyncio.run(run())
+        assert len(stream_records(metrics)) == 1
+
+
+class FakeOllamaClient:
+    def __init__(self):
+        self.closed = 0
+
+    def chat(self, stream=False, **kwargs):
+        def chunks():
+            try:
+                for word in ("one", " two", " three"):
+                    yield {"message": {"content": word}, "done": False}
+                yield {"message": {"content": ""}, "done": True,
+                       "prompt_eval_count": 3, "eval_count": 3}
+            finally:
+                self.closed += 1
+        return chunks()
+
+
+def test_abandoned_ollama_stream_releases_semaphore():
+    metrics = MetricsRegistry()
+    service = OllamaService(max_concurrency=1, metrics=metrics)
+    service._client = client = FakeOllamaClient()
+
+    for _ in service.stream_completion(MESSAGES):
+        break
+
+    assert client.closed == 1
+    assert service._semaphore.acquire(blocking=False)
+    service._semaphore.release()
+    assert len(stream_records(metrics)) == 1
+
+    assert service.stream_completion(MESSAGES).message["content"] == "one two three"
+    assert len(stream_records(metrics)) == 2
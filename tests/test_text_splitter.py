@@ -0,0 +1,83 @@
+import asyncio
+import random
+
+import pytest
+
+from TextSplitter import TextSplitter
+
+LIMIT = 60
+
+
+def make_document(seed: int) -> str:
+    # Long header titles and links cross chunk and window boundaries
+    rng = random.Random(seed)
+    words = "the quick brown fox jumps over lazy dog zażółć gęślą jaźń".split()
+    parts = []
+    for i in range(80):
+        kind = rng.random()
+        if kind < 0.3:
+            parts.append(f"[{'link text ' * rng.randint(1, 30)}]"
+                         f"(https://example.com/{i}/{'p' * rng.randint(1, 200)})")
+        elif kind < 0.4:
+            parts.append(f"\n{'#' * rng.randint(1, 3)} Header {i} "
+                         f"{'word ' * rng.randint(0, 60)}\n")
+        elif kind < 0.45:
+            parts.append(f"![image {i}](https://example.com/{i}.png)")
+        elif kind < 0.55:
+            parts.append("\n\n")
+        else:
+            parts.append(" ".join(rng.choice(words)
+                                  for _ in range(rng.randint(3, 60))))
+    return " ".join(parts)
+
+
+def split(splitter: TextSplitter, text: str) -> list:
+    return asyncio.run(splitter.split(text, LIMIT, indexed=True))
+
+
+@pytest.fixture(scope="module")
+def splitter():
+    return TextSplitter()
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("block_size", [37, 1000, 1 << 16])
+def test_split_stream_matches_indexed_split(splitter, tmp_path, seed, block_size):
+    text = make_document(seed)
+    path = tmp_path / "doc.md"
+    path.write_text(text, encoding="utf-8")
+
+    async def collect():
+        return [chunk async for chunk in splitter.split_stream(
+            str(path), LIMIT, block_size=block_size)]
+
+    assert asyncio.run(collect()) == split(splitter, text)
+
+
+@pytest.mark.parametrize("edit", [
+    lambda text, at: text[:at] + " inserted words." + text[at:],
+    lambda text, at: text[:at] + text[at + 300:],
+    lambda text, at: text[:at] + "\n## New header\n" + text[at:],
+    # Breaks or completes a link reaching into the reused chunks
+    lambda text, at: text[:at] + "](https://example.com/new)" + text[at:],
+    lambda text, at: text[:at] + "[" + text[at:],
+])
+@pytest.mark.parametrize("seed", range(4))
+def test_resplit_matches_indexed_split(splitter, seed, edit):
+    text = make_document(seed)
+    previous = split(splitter, text)
+    for at in random.Random(seed).sample(range(len(text)), 8):
+        edited = edit(text, at)
+        diff = asyncio.run(splitter.resplit(edited, previous, LIMIT))
+        expected = split(splitter, edited)
+
+        bounds = [chunk["metadata"]["start"] for chunk in diff.chunks]
+        assert bounds[0] == 0 and diff.chunks[-1]["metadata"]["end"] == len(edited)
+        assert bounds[1:] == [chunk["metadata"]["end"] for chunk in diff.chunks[:-1]]
+        spans = {(chunk["metadata"]["start"], chunk["metadata"]["end"]): chunk
+                 for chunk in expected}
+        for chunk in diff.chunks:
+            span = (chunk["metadata"]["start"], chunk["metadata"]["end"])
+            if span in spans:
+                assert chunk == spans[span]
+        assert sorted(diff.unchanged + diff.added) == list(range(len(diff.chunks)))